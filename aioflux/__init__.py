@@ -20,20 +20,22 @@ aioflux - высокопроизводительная библиотека дл
         pass
 """
 
-from typing import Any, Callable, List, Optional
+from typing import Any, Callable, List, Optional, Sequence, Tuple
 
-from aioflux.core.metrics import gauge, get_stats, incr, Timer, timing
+from aioflux.core.metrics import gauge, gauge_nowait, get_stats, incr, incr_nowait, Timer, timing
 from aioflux.core.storage.base import Storage
 from aioflux.core.storage.hybrid import HybridStorage
 from aioflux.core.storage.memory import MemoryStorage
 from aioflux.core.storage.redis_ import RedisStorage
-from aioflux.decorators.circuit_breaker import circuit_breaker, CircuitBreakerOpen
+from aioflux.decorators.circuit_breaker import circuit_breaker, CircuitBreaker, CircuitBreakerOpen
+from aioflux.decorators.guard import guarded
 from aioflux.decorators.queue import queued, queued_sync
 from aioflux.decorators.rate_limit import rate_limit, rate_limit_sync
 from aioflux.flux import BatchFlux, FluxConfig, PriorityFlux, QueueFlux
 from aioflux.limiters.adaptive import AdaptiveLimiter
 from aioflux.limiters.base import BaseLimiter
 from aioflux.limiters.composite import CompositeLimiter
+from aioflux.limiters.gcra import GCRALimiter
 from aioflux.limiters.leaky_bucket import LeakyBucketLimiter
 from aioflux.limiters.sliding_window import RedisSlidingWindow, SlidingWindowLimiter
 from aioflux.limiters.token_bucket import FastTokenBucket, TokenBucketLimiter
@@ -47,7 +49,7 @@ from aioflux.queues.delay import DelayQueue
 from aioflux.queues.fifo import FIFOQueue
 from aioflux.queues.priority import PriorityQueue
 from aioflux.utils.backoff import backoff, backoff_decorator
-from aioflux.utils.batch import batch_gather, batch_process, BatchCollector
+from aioflux.utils.batch import batch_gather, batch_gather_pairs, batch_process, BatchCollector
 from aioflux.utils.monitoring import ConsoleMonitor, Monitor, PrometheusExporter
 
 
@@ -56,7 +58,9 @@ __version__ = "0.1.3"
 __all__ = (
     "get_stats",
     "incr",
+    "incr_nowait",
     "gauge",
+    "gauge_nowait",
     "timing",
     "Timer",
     "TokenBucketLimiter",
@@ -66,6 +70,7 @@ __all__ = (
     "LeakyBucketLimiter",
     "AdaptiveLimiter",
     "CompositeLimiter",
+    "GCRALimiter",
     "PriorityQueue",
     "FIFOQueue",
     "DelayQueue",
@@ -76,7 +81,9 @@ __all__ = (
     "queued",
     "queued_sync",
     "circuit_breaker",
+    "CircuitBreaker",
     "CircuitBreakerOpen",
+    "guarded",
     "WorkerPool",
     "Scheduler",
     "Coordinator",
@@ -84,6 +91,7 @@ __all__ = (
     "backoff_decorator",
     "batch_process",
     "batch_gather",
+    "batch_gather_pairs",
     "BatchCollector",
     "Monitor",
     "ConsoleMonitor",
@@ -237,12 +245,13 @@ class LimiterFactory:
         )
 
     @staticmethod
-    def composite(limiters: List[BaseLimiter]):
+    def composite(limiters: List[BaseLimiter], *, parallel: bool = False):
         """
         Составной лимитер - комбинирует несколько.
 
         Параметры:
             limiters: список объектов, реализующих интерфейс Limiter
+            parallel: опрашивать лимитеры одновременно (для Redis-лимитеров)
 
         Полезно когда нужно ограничить и по минутам и по часам:
             LimiterFactory.composite([
@@ -250,7 +259,44 @@ class LimiterFactory:
                 LimiterFactory.token_bucket(1000, per=3600)  # 1000/час
             ])
         """
-        return CompositeLimiter(limiters)
+        return CompositeLimiter(limiters, parallel=parallel)
+
+    @staticmethod
+    def gcra(
+        rate: float,
+        per: float = 1.0,
+        burst: Optional[float] = None,
+        scope: str = "default"
+    ):
+        """
+        GCRA - токен-бакет в памяти, где состояние ключа - одно число (TAT).
+
+        Параметры:
+            rate: сколько токенов даем в период
+            per: период в секундах
+            burst: емкость (по умолчанию = rate)
+            scope: имя набора лимитов (для метрик)
+        """
+        return GCRALimiter([(rate, per, burst)], scope)
+
+    @staticmethod
+    def gcra_multi(
+        limits: Sequence[Tuple[float, float, Optional[float]]],
+        scope: str = "default"
+    ):
+        """
+        Несколько лимитов на один ключ одной проверкой - замена composite
+        из нескольких token_bucket в памяти (без release при отказе).
+
+        Параметры:
+            limits: список (rate, per, burst)
+            scope: имя набора лимитов (для метрик)
+
+        Пример:
+            # 100/мин с burst 120 и 1000/час
+            LimiterFactory.gcra_multi([(100, 60, 120), (1000, 3600, None)])
+        """
+        return GCRALimiter(limits, scope)
 
 
 class QueueFactory:
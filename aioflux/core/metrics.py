@@ -5,12 +5,46 @@
 какая задержка, сколько задач в очереди и т.д.
 """
 
-from typing import Dict, Optional
+from array import array
+from typing import Dict, Iterable, Optional, Tuple
 from collections import defaultdict
-from time import time
+from time import perf_counter
 import asyncio
 
 
+class _Ring:
+    """
+    Кольцевой буфер на последние 1024 значения гистограммы.
+
+    Значения лежат в array('d') - сырые double подряд, а не PyFloat объекты
+    по указателям: 8 КБ на метрику, GC их не обходит.
+    Размер - степень двойки, поэтому заворот индекса через & вместо %.
+    """
+
+    __slots__ = ("buf", "n", "idx")
+
+    SIZE = 1024
+    MASK = SIZE - 1
+
+    def __init__(self):
+        self.buf = array("d", bytes(8 * self.SIZE))
+        self.n = 0
+        self.idx = 0
+
+    def append(self, val: float) -> None:
+        self.buf[self.idx] = val
+        self.idx = (self.idx + 1) & self.MASK
+        if self.n < self.SIZE:
+            self.n += 1
+
+    def values(self) -> array:
+        """Заполненная часть буфера (порядок для перцев не важен)"""
+        return self.buf if self.n == self.SIZE else self.buf[:self.n]
+
+    def __len__(self) -> int:
+        return self.n
+
+
 class Metrics:
     """
     Хранилище метрик.
@@ -19,58 +53,86 @@ class Metrics:
     - Счетчики (counters) - просто плюсуем
     - Гауджи (gauges) - текущее значение
     - Гистограммы (histograms) - собираем все значения и считаем `перцы` (я так перцентили называть буду)
+
+    Рассчитано на работу в одном event loop (как и весь aioflux):
+    запись метрики - одна операция над dict/буфером без await внутри,
+    так что лок на запись не нужен. Лок держим только для get_stats/reset.
     """
     
     def __init__(self):
         self._counters: Dict[str, float] = defaultdict(float)
         self._gauges: Dict[str, float] = {}
-        self._histograms: Dict[str, list] = defaultdict(list)
+        self._histograms: Dict[str, _Ring] = defaultdict(_Ring)
+        # версия гистограммы растет на каждую запись - по ней понимаем,
+        # можно ли отдать посчитанные раньше перцы без пересортировки
+        self._hist_versions: Dict[str, int] = defaultdict(int)
+        self._hist_cache: Dict[str, Tuple[int, Dict[str, float]]] = {}
+        # общий счетчик записей - по нему мониторы видят, что что-то поменялось
+        self.version = 0
         self._lock = asyncio.Lock()
     
     async def incr(self, name: str, val: float = 1) -> None:
-        async with self._lock:
-            self._counters[name] += val
+        self.incr_nowait(name, val)
+
+    def incr_nowait(self, name: str, val: float = 1) -> None:
+        """
+        Синхронный инкремент - без создания корутины на каждое событие.
+        Лока на запись нет, так что копить в буфер и флашить не нужно -
+        пишем сразу в счетчик, get_stats видит его без задержки.
+        """
+        self._counters[name] += val
+        self.version += 1
     
     async def gauge(self, name: str, val: float) -> None:
-        async with self._lock:
-            self._gauges[name] = val
+        self.gauge_nowait(name, val)
+
+    def gauge_nowait(self, name: str, val: float) -> None:
+        """Синхронная установка гауджа"""
+        self._gauges[name] = val
+        self.version += 1
     
     async def timing(self, name: str, val: float) -> None:
         """
         Записываем время выполнения.
-        Храним последнюю 1000 значений для расчета перцев.
+        Храним последние 1024 значения для расчета перцев
+        (кольцевой буфер сам затирает самые старые).
         """
-        async with self._lock:
-            hist = self._histograms[name]
-            hist.append(val)
-            # урезаем чтоб гистограмма не разрослась
-            if len(hist) > 1000:
-                hist.pop(0)
+        self.timing_nowait(name, val)
+
+    def timing_nowait(self, name: str, val: float) -> None:
+        """Синхронная запись в гистограмму - без корутины, для горячих мест"""
+        self._histograms[name].append(val)
+        self._hist_versions[name] += 1
+        self.version += 1
     
     async def get_stats(self) -> Dict:
         """
         Забираем всю статистику разом.
         Для гистограмм считаем p50/p95/p99.
+        Гистограммы без новых значений с прошлого вызова не пересчитываем.
         """
         async with self._lock:
+            hists: Dict[str, Dict[str, float]] = {}
             stats = {
                 "counters": dict(self._counters),
                 "gauges": dict(self._gauges),
-                "histograms": {}
+                "histograms": hists
             }
-            
+
+            versions = self._hist_versions
+            cache = self._hist_cache
+            summarize = _summarize
+
             # считаем перцы для каждой гистограммы
             for name, vals in self._histograms.items():
-                if vals:
-                    sorted_vals = sorted(vals)
-                    n = len(sorted_vals)
-                    stats["histograms"][name] = {
-                        "count": n,
-                        "mean": sum(sorted_vals) / n,
-                        "p50": sorted_vals[int(n * 0.5)],
-                        "p95": sorted_vals[int(n * 0.95)],
-                        "p99": sorted_vals[int(n * 0.99)],
-                    }
+                if not vals:
+                    continue
+                version = versions[name]
+                cached = cache.get(name)
+                if cached is None or cached[0] != version:
+                    cached = (version, summarize(vals.values()))
+                    cache[name] = cached
+                hists[name] = dict(cached[1])
             
             return stats
     
@@ -79,6 +141,27 @@ class Metrics:
             self._counters.clear()
             self._gauges.clear()
             self._histograms.clear()
+            self._hist_versions.clear()
+            self._hist_cache.clear()
+            self.version += 1
+
+
+def _summarize(vals: Iterable[float]) -> Dict[str, float]:
+    """
+    Считаем count/mean/p50/p95/p99 по выборке.
+
+    Выборка не больше 1024 значений, так что один sorted() (timsort на C)
+    тут дешевле, чем тащить numpy ради partition.
+    """
+    sorted_vals = sorted(vals)
+    n = len(sorted_vals)
+    return {
+        "count": n,
+        "mean": sum(sorted_vals) / n,
+        "p50": sorted_vals[int(n * 0.5)],
+        "p95": sorted_vals[int(n * 0.95)],
+        "p99": sorted_vals[int(n * 0.99)],
+    }
 
 
 # глобал инстанс метрик - для юза из любого места
@@ -90,11 +173,21 @@ async def incr(name: str, val: float = 1) -> None:
     await _global_metrics.incr(name, val)
 
 
+def incr_nowait(name: str, val: float = 1) -> None:
+    """Плюсуем глобальный счетчик синхронно (для горячих мест)"""
+    _global_metrics.incr_nowait(name, val)
+
+
 async def gauge(name: str, val: float) -> None:
     """Устанавливаем глобальный гаудж"""
     await _global_metrics.gauge(name, val)
 
 
+def gauge_nowait(name: str, val: float) -> None:
+    """Устанавливаем глобальный гаудж синхронно (для горячих мест)"""
+    _global_metrics.gauge_nowait(name, val)
+
+
 async def timing(name: str, val: float) -> None:
     """Записываем время в глобальную гистограмму"""
     await _global_metrics.timing(name, val)
@@ -105,6 +198,11 @@ async def get_stats() -> Dict:
     return await _global_metrics.get_stats()
 
 
+def get_version() -> int:
+    """Счетчик записей в глобальные метрики - не изменился, значит и статистика та же"""
+    return _global_metrics.version
+
+
 class Timer:
     """
     Контекстный менеджер для замера времени
@@ -113,17 +211,19 @@ class Timer:
         async with Timer("my_operation"):
             await do_something()
     
-    Автоматом запишет время выполнения в метрики
+    Автоматом запишет время выполнения в метрики.
+    Меряем через perf_counter (монотонный, не прыгает от NTP),
+    а пишем синхронно - на выходе из блока нет лишнего await.
     """
     
     def __init__(self, name: str):
         self.name = name
-        self.start = 0
+        self.start = 0.0
     
     async def __aenter__(self):
-        self.start = time()
+        self.start = perf_counter()
         return self
     
     async def __aexit__(self, *args):
-        elapsed = (time() - self.start) * 1000
-        await timing(self.name, elapsed)
+        elapsed = (perf_counter() - self.start) * 1000
+        _global_metrics.timing_nowait(self.name, elapsed)
@@ -20,31 +20,34 @@ class HybridStorage(Storage):
 
     async def get(self, key: str) -> Optional[Any]:
         """
-        Сначала смотрим в L1 (память).
+        Сначала смотрим в L1 (память) - синхронно, попадание в L1
+        это один лукап в dict без корутины.
         Если нет - идем в L2 (Redis) и кэшируем в L1.
         """
-        val = await self._l1.get(key)
+        val = self._l1.get_nowait(key)
         if val is None:
             val = await self._l2.get(key)
             if val is not None:
                 # Кэшируем на минуту
-                await self._l1.set(key, val, ttl=60)
+                self._l1.set_nowait(key, val, ttl=60)
         return val
 
     async def set(self, key: str, val: Any, ttl: Optional[float] = None) -> None:
         """
         Пишем в оба слоя сразу (write-through).
+        L1 - синхронно, без корутины и таска; ждем только сетевой round-trip до Redis.
         В L1 храним не дольше минуты.
         """
-        await self._l1.set(key, val, ttl=min(ttl, 60) if ttl else 60)
+        self._l1.set_nowait(key, val, ttl=min(ttl, 60) if ttl else 60)
         await self._l2.set(key, val, ttl=ttl)
 
     async def incr(self, key: str, delta: float = 1) -> float:
         """
         Инкремент идет только в L2 (Redis).
-        L1 инвалидируем чтобы не было рассинхрона.
+        L1 инвалидируем чтобы не было рассинхрона - синхронно, без лока,
+        так что на весь инкремент остается один сетевой round-trip.
         """
-        await self._l1.delete(key)
+        self._l1.delete_nowait(key)
         return await self._l2.incr(key, delta)
 
     async def decr(self, key: str, delta: float = 1) -> float:
@@ -52,10 +55,13 @@ class HybridStorage(Storage):
         return await self.incr(key, -delta)
 
     async def delete(self, key: str) -> None:
-        """Удаляем из обоих слоев"""
-        await self._l1.delete(key)
+        """Удаляем из обоих слоев (L1 - синхронно)"""
+        self._l1.delete_nowait(key)
         await self._l2.delete(key)
 
     async def exists(self, key: str) -> bool:
-        """Проверяем оба слоя"""
+        """
+        Проверяем оба слоя.
+        Сначала L1 - если ключ там, в Redis вообще не ходим.
+        """
         return await self._l1.exists(key) or await self._l2.exists(key)
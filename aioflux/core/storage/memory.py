@@ -1,58 +1,150 @@
-import asyncio
-from typing import Any, Dict, Optional
+import heapq
+from collections import OrderedDict
+from math import inf
+from typing import Any, List, Optional, Tuple
 
 from aioflux.core.storage.base import Storage
-from aioflux.utils.common import now
+from aioflux.utils.common import SweepTimer, monotonic
 
 
 class MemoryStorage(Storage):
     """
     Хранилище в памяти процесса.
+
+    Значение и время протухания лежат вместе: key -> (val, expires_at),
+    для ключей без ttl expires_at = inf. Один хэш-лукап на операцию.
+
+    Ключи держим в порядке последнего использования (LRU).
+    При переполнении сначала выкидываем уже протухший ключ, если такой есть,
+    и только потом - самый давно не тронутый живой.
+
+    Локов нет: ни один метод не делает await посреди чтения-изменения-записи,
+    так что в рамках одного event loop операции и так атомарны.
+
+    Протухание:
+    - пассивное: на чтении проверяем только запрошенный ключ;
+    - активное: к сроку ближайшего ключа в куче (expires_at, key), но не чаще
+      раза в `sweep_interval` секунд, снимаем протухшие ключи с вершины кучи,
+      не больше `sweep_limit` за проход. Таймер ставится только из запущенного
+      loop'а: set_nowait вне asyncio работает, а чистку взведет следующий вызов
+      из loop'а (на чтении протухший ключ все равно не отдадим).
+
+    В куче бывают устаревшие записи (ключ перезаписали или удалили) -
+    их не ищем, а просто пропускаем, когда они всплывают наверх.
     """
 
+    sweep_interval = 0.1
+    sweep_limit = 1000
+
     def __init__(self, max_size: int = 100000):
-        self._data: Dict[str, Any] = {}
-        self._expiry: Dict[str, float] = {}
-        self._lock = asyncio.Lock()
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
         self._max_size = max_size
+        self._sweeper = SweepTimer(self._cleanup_expired)
+        self._exp_heap: List[Tuple[float, str]] = []
+
+    def _live_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Достаем запись, если она есть и не протухла (протухшую сразу удаляем)"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] <= monotonic():
+            self.delete_nowait(key)
+            return None
+        return entry
 
     async def get(self, key: str) -> Optional[Any]:
-        await self._cleanup_expired()
-        return self._data.get(key)
+        return self.get_nowait(key)
+
+    def get_nowait(self, key: str) -> Optional[Any]:
+        """Синхронное чтение - для вызова без await"""
+        entry = self._live_entry(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
 
     async def set(self, key: str, val: Any, ttl: Optional[float] = None) -> None:
-        async with self._lock:
-            # Если места нет - выкидываем самый старый
-            if len(self._data) >= self._max_size and key not in self._data:
-                oldest = min(self._expiry.items(), key=lambda x: x[1])[0] if self._expiry else None
-                if oldest:
-                    del self._data[oldest]
-                    del self._expiry[oldest]
-
-            self._data[key] = val
-            if ttl:
-                self._expiry[key] = now() + ttl
+        self.set_nowait(key, val, ttl)
+
+    def set_nowait(self, key: str, val: Any, ttl: Optional[float] = None) -> None:
+        """Синхронная запись - для вызова без await"""
+        if ttl:
+            expires_at = monotonic() + ttl
+            self._entries[key] = (val, expires_at)
+            self._push_expiry(expires_at, key)
+        else:
+            self._entries[key] = (val, inf)
+        self._entries.move_to_end(key)
+        self._evict()
 
     async def incr(self, key: str, delta: float = 1) -> float:
-        async with self._lock:
-            val = self._data.get(key, 0) + delta
-            self._data[key] = val
-            return val
+        val, expires_at = self._live_entry(key) or (0, inf)
+        val += delta
+        self._entries[key] = (val, expires_at)
+        self._entries.move_to_end(key)
+        self._evict()
+        return val
 
     async def decr(self, key: str, delta: float = 1) -> float:
         return await self.incr(key, -delta)
 
     async def delete(self, key: str) -> None:
-        async with self._lock:
-            self._data.pop(key, None)
-            self._expiry.pop(key, None)
+        self.delete_nowait(key)
+
+    def delete_nowait(self, key: str) -> None:
+        """Синхронное удаление - для вызова из других хранилищ без await"""
+        self._entries.pop(key, None)
 
     async def exists(self, key: str) -> bool:
-        await self._cleanup_expired()
-        return key in self._data
-
-    async def _cleanup_expired(self) -> None:
-        current = now()
-        expired = [k for k, exp in self._expiry.items() if exp <= current]
-        for k in expired:
-            await self.delete(k)
+        return self._live_entry(key) is not None
+
+    def _evict(self) -> None:
+        """
+        Если места нет - выкидываем протухший ключ с вершины кучи,
+        а если протухших нет - самый давно не использованный.
+        """
+        if len(self._entries) <= self._max_size:
+            return
+        if self._pop_expired(monotonic()) is None:
+            self._entries.popitem(last=False)
+
+    def _push_expiry(self, expires_at: float, key: str) -> None:
+        heap = self._exp_heap
+        heapq.heappush(heap, (expires_at, key))
+        # много устаревших записей (частые перезаписи) - пересобираем кучу
+        if len(heap) > 2 * len(self._entries) + 1024:
+            heap[:] = [(exp, k) for k, (_, exp) in self._entries.items() if exp != inf]
+            heapq.heapify(heap)
+        self._schedule_sweep()
+
+    def _pop_expired(self, current: float) -> Optional[str]:
+        """
+        Снимаем с кучи один протухший ключ и удаляем его.
+        Устаревшие записи по дороге выкидываем. Если протухших нет - None.
+        """
+        heap = self._exp_heap
+        while heap and heap[0][0] <= current:
+            expires_at, key = heapq.heappop(heap)
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == expires_at:
+                del self._entries[key]
+                return key
+        return None
+
+    def _schedule_sweep(self) -> None:
+        """Ставим фоновую чистку к сроку ближайшего ключа в куче"""
+        at = self._exp_heap[0][0]
+        earliest = monotonic() + self.sweep_interval
+        self._sweeper.schedule(at if at > earliest else earliest)
+
+    def _cleanup_expired(self) -> None:
+        """
+        Активное протухание: снимаем с кучи все, что уже протухло
+        (не больше sweep_limit ключей за проход, чтобы не подвесить loop).
+        Синхронно и без await внутри - с другими корутинами не пересекается.
+        """
+        current = monotonic()
+        for _ in range(self.sweep_limit):
+            if self._pop_expired(current) is None:
+                break
+
+        if self._exp_heap:
+            self._schedule_sweep()
@@ -1,42 +1,147 @@
-from typing import Any, Optional
+import asyncio
+import hashlib
+import math
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
 
-from redis.asyncio import Redis
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.exceptions import NoScriptError
 
 from aioflux.core.storage.base import Storage
 
 
+# то, во что str() пишет int/float: цифры ASCII, точка, экспонента.
+# float() понимает больше ('nan', 'inf', '1_000', ' 5 ', не-ASCII цифры) -
+# такие строки отдаем строками, как раньше
+_NUMBER = re.compile(r"[-+]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?")
+
+
 class RedisStorage(Storage):
-    def __init__(self, url: str = "redis://localhost", pool_size: int = 10):
+    """
+    Хранилище в Redis.
+
+    Значения храним как обычные строки Redis, без своих префиксов - тот же
+    формат читают INCRBYFLOAT, Lua скрипты и клиенты на других языках.
+    На чтении: обычная запись числа (цифры, точка, экспонента) - float,
+    остальное - строка.
+    Поэтому строка из одних цифр вернется числом: если это важно, храните
+    такие значения в своем формате (например JSON).
+
+    auto_pipeline: вызовы eval_script (а это все Lua лимитеры) из разных
+    корутин в пределах одной итерации event loop копятся и уходят одним
+    пайплайном на следующей итерации - N одновременных acquire = 1 round-trip.
+    Цена - одна лишняя итерация loop на вызов, поэтому по умолчанию выключено.
+    """
+
+    # больше стольки скриптов в пачке не копим - отправляем сразу
+    _PIPELINE_MAX = 128
+
+    def __init__(
+        self,
+        url: str = "redis://localhost",
+        pool_size: int = 10,
+        pool_timeout: Optional[float] = 5.0,
+        auto_pipeline: bool = False
+    ):
+        """
+        pool_size - максимум соединений. Обычно хватает меньше 10,
+        больше - только лишняя нагрузка на Redis.
+        pool_timeout - сколько ждать свободное соединение, когда пул занят
+        (None - ждать бесконечно). Потом - ConnectionError.
+        auto_pipeline - склеивать одновременные eval_script в один пайплайн.
+        """
         self._url = url
         self._pool_size = pool_size
-        self._redis = None
+        self._pool_timeout = pool_timeout
+        self._redis: Optional[Redis] = None
+        self._sha_cache: Dict[str, str] = {}
+        self._auto_pipeline = auto_pipeline
+        # (script, keys, args, future) - ждут отправки в следующем пайплайне
+        self._pending: List[Tuple[str, list, list, asyncio.Future]] = []
+        self._flushes: Set[asyncio.Task] = set()
 
-    async def _get_redis(self):
-        if not self._redis:
-            self._redis = await Redis.from_url(
+    async def connect(self) -> None:
+        """
+        Создаем клиент заранее и прогреваем пул: PING на каждый слот,
+        чтобы первые запросы не платили за TCP handshake + AUTH.
+        Необязательно - без connect() клиент создастся лениво на первом запросе.
+        """
+        r = await self._get_redis()
+        await asyncio.gather(*[r.ping() for _ in range(self._pool_size)])
+
+    async def _get_redis(self) -> Redis:
+        """
+        Клиент создаем лениво. Между проверкой и присваиванием нет await,
+        так что две корутины на первом обращении не создадут два пула -
+        лок для этого не нужен (все крутится в одном event loop).
+        """
+        r = self._redis
+        if r is None:
+            # Blocking пул: при нехватке соединений ждем свободное,
+            # а не падаем с "Too many connections"
+            pool = BlockingConnectionPool.from_url(
                 self._url,
                 max_connections=self._pool_size,
+                timeout=self._pool_timeout,
                 decode_responses=True
             )
-        return self._redis
+            r = self._redis = Redis(connection_pool=pool)
+        return r
+
+    async def pipeline(self):
+        """
+        Пайплайн без MULTI/EXEC - чтобы пачку команд отправить за один round-trip.
+        Ответы приходят сырые - строки как есть, без приведения к float.
+
+        Пример:
+            pipe = await storage.pipeline()
+            pipe.get("a")
+            pipe.get("b")
+            a, b = await pipe.execute()
+        """
+        r = await self._get_redis()
+        return r.pipeline(transaction=False)
 
     async def get(self, key: str) -> Optional[Any]:
         r = await self._get_redis()
         val = await r.get(key)
-        if val and val.replace('.', '', 1).replace('-', '', 1).isdigit():
-            return float(val)
+        if val is None:
+            return None
+        if _NUMBER.fullmatch(val):
+            num = float(val)
+            # '1e999' переполняется в inf - это уже не то, что записали
+            if math.isfinite(num):
+                return num
         return val
 
     async def set(self, key: str, val: Any, ttl: Optional[float] = None) -> None:
         r = await self._get_redis()
+        raw = str(val)
         if ttl:
-            await r.setex(key, int(ttl), str(val))
+            await r.setex(key, int(ttl), raw)
         else:
-            await r.set(key, str(val))
+            await r.set(key, raw)
+
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        """
+        Пишем пачку ключей одним пайплайном - один round-trip вместо N.
+        """
+        r = await self._get_redis()
+        async with r.pipeline(transaction=False) as pipe:
+            for key, val in items.items():
+                if ttl:
+                    pipe.setex(key, int(ttl), str(val))
+                else:
+                    pipe.set(key, str(val))
+            await pipe.execute()
 
     async def incr(self, key: str, delta: float = 1) -> float:
+        """
+        INCRBYFLOAT. redis-py сам приводит ответ к float через response callback,
+        явный float() - страховка на случай клиента без этого колбэка.
+        """
         r = await self._get_redis()
-        return await r.incrbyfloat(key, delta)
+        return float(await r.incrbyfloat(key, delta))
 
     async def decr(self, key: str, delta: float = 1) -> float:
         return await self.incr(key, -delta)
@@ -49,10 +154,106 @@ class RedisStorage(Storage):
         r = await self._get_redis()
         return await r.exists(key) > 0
 
+    def _sha(self, script: str) -> str:
+        """SHA1 скрипта - считаем один раз и кэшируем"""
+        sha = self._sha_cache.get(script)
+        if sha is None:
+            sha = hashlib.sha1(script.encode()).hexdigest()
+            self._sha_cache[script] = sha
+        return sha
+
+    async def register_script(self, script: str) -> str:
+        """
+        Загружаем Lua скрипт в Redis (SCRIPT LOAD) и возвращаем его SHA1.
+        Можно дергать заранее, чтобы первый запрос не ловил NOSCRIPT.
+        """
+        r = await self._get_redis()
+        await r.script_load(script)
+        return self._sha(script)
+
     async def eval_script(self, script: str, keys: list, args: list) -> Any:
         """
         Выполняем Lua скрипт в Redis.
         Нужно для атомарных операций в rate limiter'ах.
+
+        Тело скрипта не гоняем по сети на каждый вызов - шлем EVALSHA по хэшу.
+        Если Redis скрипта не знает (NOSCRIPT) - грузим его и повторяем.
         """
+        if self._auto_pipeline:
+            return await self._eval_pipelined(script, keys, args)
+
         r = await self._get_redis()
-        return await r.eval(script, len(keys), *keys, *args)
+        sha = self._sha(script)
+        try:
+            return await r.evalsha(sha, len(keys), *keys, *args)
+        except NoScriptError:
+            await r.script_load(script)
+            return await r.evalsha(sha, len(keys), *keys, *args)
+
+    def _eval_pipelined(self, script: str, keys: list, args: list) -> asyncio.Future:
+        """
+        Ставим скрипт в пачку и отдаем future на его результат.
+        Первый в пачке планирует отправку через call_soon: к ее моменту
+        все корутины этой итерации loop уже успеют докинуть свои вызовы.
+        """
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        pending = self._pending
+        if not pending:
+            loop.call_soon(self._flush_pending)
+        pending.append((script, keys, args, fut))
+        if len(pending) >= self._PIPELINE_MAX:
+            self._flush_pending()
+        return fut
+
+    def _flush_pending(self) -> None:
+        """Забираем накопленную пачку и отправляем ее отдельной таской"""
+        batch = self._pending
+        if not batch:
+            return
+        self._pending = []
+        task = asyncio.ensure_future(self._send_batch(batch))
+        # держим ссылку, иначе таску может собрать GC посреди отправки
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _send_batch(self, batch: List[Tuple[str, list, list, asyncio.Future]], retry: bool = True) -> None:
+        """
+        Один пайплайн EVALSHA на всю пачку, результаты раздаем по future.
+        Скрипты, которых Redis не знает, грузим и досылаем один раз.
+        """
+        try:
+            r = await self._get_redis()
+            async with r.pipeline(transaction=False) as pipe:
+                for script, keys, args, _ in batch:
+                    pipe.evalsha(self._sha(script), len(keys), *keys, *args)
+                results = await pipe.execute(raise_on_error=False)
+        except Exception as e:
+            for *_, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+
+        missing = []
+        for item, res in zip(batch, results):
+            fut = item[3]
+            if fut.done():
+                # вызывающий уже не ждет (отменили)
+                continue
+            if retry and isinstance(res, NoScriptError):
+                missing.append(item)
+            elif isinstance(res, Exception):
+                fut.set_exception(res)
+            else:
+                fut.set_result(res)
+
+        if missing:
+            try:
+                for script in {item[0] for item in missing}:
+                    await r.script_load(script)
+            except Exception as e:
+                for *_, fut in missing:
+                    if not fut.done():
+                        fut.set_exception(e)
+                return
+            await self._send_batch(missing, retry=False)
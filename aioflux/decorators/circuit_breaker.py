@@ -1,8 +1,7 @@
 from functools import wraps
-from typing import Callable, Any
-from aioflux.utils.common import now
-from aioflux.core.metrics import incr
-import asyncio
+from typing import Any, Callable, Optional
+from aioflux.utils.common import monotonic
+from aioflux.core.metrics import incr_nowait
 
 
 class CircuitBreakerOpen(Exception):
@@ -25,71 +24,105 @@ class CircuitBreaker:
     - half_open — тестируем: один вызов проходит, если успешен — возвращаемся в closed.
     """
 
+    _CLOSED = 0
+    _OPEN = 1
+    _HALF_OPEN = 2
+
+    _STATE_NAMES = {_CLOSED: "closed", _OPEN: "open", _HALF_OPEN: "half_open"}
+
     def __init__(
         self,
         failure_threshold: int = 5,
         timeout: float = 60.0,
-        expected_exception: type = Exception
+        expected_exception: type = Exception,
+        backoff_base: Optional[float] = None
     ):
         """
-        failure_threshold — сколько подряд ошибок допускается до перехода в `open`
+        failure_threshold — сколько ошибок допускается до перехода в `open`
+                            (счетчик обнуляется при закрытии цепи, а не на каждом успехе)
         timeout — сколько секунд держать цепь открытой
+                  (с backoff_base — потолок для экспоненциального таймаута)
         expected_exception — тип исключений, считающихся "ошибками"
+        backoff_base — если задан, таймаут растет экспоненциально:
+                       backoff_base → x2 → x4 … до `timeout`, сбрасывается после успеха.
+                       Живую зависимость пробуем быстро, мертвую - все реже.
         """
         self.failure_threshold = failure_threshold
         self.timeout = timeout
         self.expected_exception = expected_exception
+        self.backoff_base = backoff_base
 
         self._failure_count = 0
-        self._last_failure_time = 0
-        self._state = "closed"
-        self._lock = asyncio.Lock()
+        self._consecutive_opens = 0
+        self._reopen_at = 0.0  # когда из open можно пробовать half_open
+        self._state = self._CLOSED
+
+    @property
+    def state(self) -> str:
+        """Текущее состояние: closed / open / half_open"""
+        return self._STATE_NAMES[self._state]
+
+    @property
+    def is_open(self) -> bool:
+        """Цепь разомкнута и таймаут еще не вышел - вызов точно будет отклонен"""
+        return self._state == self._OPEN and monotonic() <= self._reopen_at
+
+    def _next_open_timeout(self) -> float:
+        """Сколько держать цепь открытой на этот раз"""
+        if self.backoff_base is None:
+            return self.timeout
+        return min(self.backoff_base * (2 ** (self._consecutive_opens - 1)), self.timeout)
 
     async def call(self, func: Callable, *args, **kwargs) -> Any:
         """
         Обертка для вызова функции через предохранитель.
         Контролирует ошибки и переключает состояние при необходимости.
+
+        Переходы между состояниями не содержат await (метрики пишем через
+        incr_nowait), поэтому в одном event loop они атомарны и лок не нужен.
+        Отказ в open - просто сравнение времени и инкремент счетчика.
         """
-        async with self._lock:
-            if self._state == "open":
-                # проверяем, истек ли таймаут
-                if now() - self._last_failure_time > self.timeout:
-                    self._state = "half_open"
-                    self._failure_count = 0
-                    await incr("circuit_breaker.half_open")
-                else:
-                    await incr("circuit_breaker.rejected")
-                    raise CircuitBreakerOpen("Circuit breaker is open")
+        if self._state == self._OPEN:
+            # проверяем, истек ли таймаут
+            if monotonic() > self._reopen_at:
+                self._state = self._HALF_OPEN
+                self._failure_count = 0
+                incr_nowait("circuit_breaker.half_open")
+            else:
+                incr_nowait("circuit_breaker.rejected")
+                raise CircuitBreakerOpen("Circuit breaker is open")
 
         try:
             result = await func(*args, **kwargs)
-
-            async with self._lock:
-                # успешный вызов в half_open → возвращаемся в норму
-                if self._state == "half_open":
-                    self._state = "closed"
-                    self._failure_count = 0
-                    await incr("circuit_breaker.closed")
-
-            return result
-
         except self.expected_exception:
             # фиксируем неудачу
-            async with self._lock:
-                self._failure_count += 1
-                self._last_failure_time = now()
+            self._failure_count += 1
 
-                if self._failure_count >= self.failure_threshold:
-                    self._state = "open"
-                    await incr("circuit_breaker.opened")
+            if self._failure_count >= self.failure_threshold:
+                self._state = self._OPEN
+                self._consecutive_opens += 1
+                # момент переоткрытия считаем один раз, на переходе,
+                # в open остается одно сравнение
+                self._reopen_at = monotonic() + self._next_open_timeout()
+                incr_nowait("circuit_breaker.opened")
 
             raise
 
+        # успешный вызов в half_open → возвращаемся в норму
+        if self._state == self._HALF_OPEN:
+            self._state = self._CLOSED
+            self._failure_count = 0
+            self._consecutive_opens = 0
+            incr_nowait("circuit_breaker.closed")
+
+        return result
+
 
 def circuit_breaker(
     failure_threshold: int = 5,
     timeout: float = 60.0,
-    expected_exception: type = Exception
+    expected_exception: type = Exception,
+    backoff_base: Optional[float] = None
 ):
     """
     Декоратор для быстрого применения CircuitBreaker к функции.
@@ -98,13 +131,23 @@ def circuit_breaker(
         @circuit_breaker(failure_threshold=3, timeout=30)
         async def fetch_data():
             ...
+
+        # таймаут 0.5 → 1 → 2 → … → 30 сек, пока зависимость лежит
+        @circuit_breaker(failure_threshold=3, timeout=30, backoff_base=0.5)
+        async def fetch_data():
+            ...
     """
-    cb = CircuitBreaker(failure_threshold, timeout, expected_exception)
+    cb = CircuitBreaker(failure_threshold, timeout, expected_exception, backoff_base)
+    call = cb.call
 
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         async def wrapper(*args, **kwargs) -> Any:
-            return await cb.call(func, *args, **kwargs)
+            # разомкнута - отказываем прямо тут, без корутины cb.call
+            if cb.is_open:
+                incr_nowait("circuit_breaker.rejected")
+                raise CircuitBreakerOpen("Circuit breaker is open")
+            return await call(func, *args, **kwargs)
 
         wrapper.__circuit_breaker__ = cb
         return wrapper
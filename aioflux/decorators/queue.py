@@ -1,8 +1,17 @@
-from functools import wraps
+from functools import partial, wraps
 from typing import Optional, Callable, Any
 from aioflux.queues.base.base import BaseQueue
 from aioflux.queues.fifo import FIFOQueue
+from aioflux.utils.common import run_task
 import asyncio
+import concurrent.futures
+import threading
+import weakref
+
+_bg_loop: Optional[asyncio.AbstractEventLoop] = None
+_bg_lock = threading.Lock()
+# очереди, которые queued_sync сам запустил в фоновом loop
+_bg_queues: "weakref.WeakSet[BaseQueue]" = weakref.WeakSet()
 
 
 def queued(
@@ -30,25 +39,27 @@ def queued(
         queue = FIFOQueue(workers=workers)
         asyncio.create_task(queue.start())
 
-    def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        async def wrapper(*args, **kwargs) -> Any:
-            result_future = asyncio.Future()
-
-            async def task():
-                try:
-                    result = await func(*args, **kwargs)
-                    result_future.set_result(result)
-                except Exception as e:
-                    result_future.set_exception(e)
-
-            # вычисляем приоритет
-            pri = priority
-            if priority_fn:
-                pri = priority_fn(*args, **kwargs)
+    put = queue.put
 
-            await queue.put(task, priority=pri or 0)
-            return await result_future
+    def decorator(func: Callable) -> Callable:
+        # ветки по приоритету решаем один раз, при декорировании
+        if priority_fn:
+            @wraps(func)
+            async def wrapper(*args, **kwargs) -> Any:
+                result_future = asyncio.get_running_loop().create_future()
+                # partial вместо замыкания - без новой функции и ячеек на каждый вызов
+                task = partial(run_task, func, args, kwargs, result_future)
+                await put(task, priority=priority_fn(*args, **kwargs) or 0)
+                return await result_future
+        else:
+            fixed = priority or 0
+
+            @wraps(func)
+            async def wrapper(*args, **kwargs) -> Any:
+                result_future = asyncio.get_running_loop().create_future()
+                task = partial(run_task, func, args, kwargs, result_future)
+                await put(task, priority=fixed)
+                return await result_future
 
         wrapper.__queue__ = queue
         return wrapper
@@ -56,6 +67,25 @@ def queued(
     return decorator
 
 
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """
+    Event loop в отдельном daemon-потоке - общий для всех queued_sync.
+    Создается один раз, при первом обращении.
+    """
+    global _bg_loop
+    if _bg_loop is None:
+        with _bg_lock:
+            if _bg_loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever,
+                    name="aioflux-queued-sync",
+                    daemon=True
+                ).start()
+                _bg_loop = loop
+    return _bg_loop
+
+
 def queued_sync(
     queue: Optional[BaseQueue] = None,
     priority: Optional[int] = None,
@@ -66,7 +96,20 @@ def queued_sync(
     Синхронная версия queued-декоратора.
 
     Можно использовать для обычных функций, чтобы их выполнение
-    шло через асинхронную очередь (внутри запускается event loop).
+    шло через асинхронную очередь.
+
+    Очередь живет в фоновом event loop (отдельный поток), вызывающий поток
+    просто ждет результат. Поэтому декоратор работает и из обычного кода,
+    и из потоков, и даже изнутри чужого запущенного loop.
+    Сама функция выполняется в thread pool, так что workers=N
+    действительно дает N параллельных вызовов.
+
+    Свою очередь передавайте незапущенной - queued_sync сам запустит ее
+    в фоновом loop. Уже запущенная где-то еще очередь (ее воркеры живут
+    в чужом loop и фоновый loop их не обслуживает) - ValueError.
+    Вызов из самого фонового loop (например из async-задачи в этой же
+    очереди) - RuntimeError: ждать результат там значит заблокировать loop,
+    который должен его посчитать.
 
     Пример:
         @queued_sync(workers=2)
@@ -74,20 +117,38 @@ def queued_sync(
             time.sleep(1)
             return x * 2
     """
+    loop = _background_loop()
     if queue is None:
         queue = FIFOQueue(workers=workers)
-        loop = asyncio.get_event_loop()
-        loop.create_task(queue.start())
+    with _bg_lock:
+        if queue not in _bg_queues:
+            if getattr(queue, "_running", False):
+                raise ValueError(
+                    "queued_sync needs a queue that is not started yet: "
+                    "it runs the queue in its own background loop"
+                )
+            asyncio.run_coroutine_threadsafe(queue.start(), loop).result()
+            _bg_queues.add(queue)
 
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs) -> Any:
-            loop = asyncio.get_event_loop()
-            result_future = asyncio.Future()
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if running is loop:
+                raise RuntimeError(
+                    f"{func.__qualname__} is queued_sync and cannot be called "
+                    "from its background loop: waiting there would deadlock"
+                )
+            result_future = concurrent.futures.Future()
 
             async def task():
                 try:
-                    result = func(*args, **kwargs)
+                    result = await asyncio.get_running_loop().run_in_executor(
+                        None, partial(func, *args, **kwargs)
+                    )
                     result_future.set_result(result)
                 except Exception as e:
                     result_future.set_exception(e)
@@ -96,8 +157,10 @@ def queued_sync(
             if priority_fn:
                 pri = priority_fn(*args, **kwargs)
 
-            loop.run_until_complete(queue.put(task, priority=pri or 0))
-            return loop.run_until_complete(result_future)
+            asyncio.run_coroutine_threadsafe(
+                queue.put(task, priority=pri or 0), loop
+            ).result()
+            return result_future.result()
 
         wrapper.__queue__ = queue
         return wrapper
@@ -4,6 +4,7 @@ from aioflux.limiters.base import BaseLimiter
 from aioflux.limiters.token_bucket import TokenBucketLimiter
 from aioflux.core.storage.base import Storage
 import asyncio
+import time
 
 
 def rate_limit(
@@ -22,19 +23,24 @@ def rate_limit(
         else:
             limiter = TokenBucketLimiter(rate, per, burst, storage, scope)
     
+    # метод берем один раз, а не через атрибут на каждом вызове
+    acquire_wait = limiter.acquire_wait
+
     def decorator(func: Callable) -> Callable:
+        default_key = f"{func.__module__}.{func.__name__}"
+
         @wraps(func)
         async def wrapper(*args, **kwargs) -> Any:
             if key_fn:
                 key = key_fn(*args, **kwargs)
             else:
-                key = f"{func.__module__}.{func.__name__}"
+                key = default_key
             
-            acquired = False
+            # спим ровно столько, сколько лимитер просит, а не опрашиваем каждые 10мс
+            acquired, retry_after = await acquire_wait(key)
             while not acquired:
-                acquired = await limiter.acquire(key)
-                if not acquired:
-                    await asyncio.sleep(0.01)
+                await asyncio.sleep(max(retry_after, 0.001))
+                acquired, retry_after = await acquire_wait(key)
             
             return await func(*args, **kwargs)
         
@@ -60,18 +66,23 @@ def rate_limit_sync(
         else:
             limiter = TokenBucketLimiter(rate, per, burst, storage, scope)
     
+    acquire_wait = limiter.acquire_wait
+
     def decorator(func: Callable) -> Callable:
+        default_key = f"{func.__module__}.{func.__name__}"
+
         @wraps(func)
         def wrapper(*args, **kwargs) -> Any:
             if key_fn:
                 key = key_fn(*args, **kwargs)
             else:
-                key = f"{func.__module__}.{func.__name__}"
+                key = default_key
             
             loop = asyncio.get_event_loop()
-            while not loop.run_until_complete(limiter.acquire(key)):
-                import time
-                time.sleep(0.01)
+            acquired, retry_after = loop.run_until_complete(acquire_wait(key))
+            while not acquired:
+                time.sleep(max(retry_after, 0.001))
+                acquired, retry_after = loop.run_until_complete(acquire_wait(key))
             
             try:
                 return func(*args, **kwargs)
@@ -1,13 +1,12 @@
 import asyncio
-from dataclasses import dataclass, field
-from time import time
-from typing import Any, Awaitable, Callable, Dict, Generic, List, Optional, TypeVar
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
 
-from aioflux import batch_gather, batch_process
-from aioflux.core.metrics import gauge, incr
+from aioflux.core.metrics import gauge_nowait, incr, incr_nowait
 from aioflux.limiters.base import BaseLimiter
 from aioflux.queues.base.typed_queue import Handler, TypedQueue
-from aioflux.utils.batch import BatchCollector
+from aioflux.utils.batch import batch_gather, batch_gather_pairs, batch_process, BatchCollector
+from aioflux.utils.common import timeout as _timeout
 
 
 T = TypeVar('T')
@@ -22,13 +21,15 @@ class FluxConfig:
     max_retries: сколько раз пытаться обработать при ошибке
     retry_delay: базовая задержка между попытками в секундах
     timeout: таймаут на обработку одного элемента
-    key_fn: функция для генерации ключа из элемента (для лимитеров)
+    key_fn: функция для генерации ключа из элемента (для лимитеров).
+        По умолчанию None - один общий ключ на весь процессор (его name),
+        без хэширования и форматирования на каждый элемент.
     """
     workers: int = 4
     max_retries: int = 3
     retry_delay: float = 1.0
     timeout: Optional[float] = None
-    key_fn: Optional[Callable[[Any], str]] = field(default=lambda: lambda x: str(hash(x)))
+    key_fn: Optional[Callable[[Any], str]] = None
 
 
 class QueueFlux(Generic[T, R]):
@@ -55,6 +56,16 @@ class QueueFlux(Generic[T, R]):
         self._tasks = []
         self._running = False
         self._stats = {"processed": 0, "failed": 0, "rejected": 0}
+        # сколько элементов воркеры держат на руках (взяли из очереди, еще не закончили)
+        self._active = 0
+        # взводится воркерами, когда работы не осталось - wait_complete ждет его, а не опрашивает
+        self._idle: Optional[asyncio.Event] = None
+        # имена метрик собираем один раз, а не f-строкой на каждый элемент
+        self._m = {
+            m: f"flux.{name}.{m}"
+            for m in ("submitted", "started", "stopped", "processed",
+                      "rejected", "errors", "timeout", "queue_size")
+        }
 
     async def submit(self, item: T, priority: int = 0) -> None:
         """
@@ -64,19 +75,30 @@ class QueueFlux(Generic[T, R]):
         priority: приоритет выполнения (выше = раньше)
         """
         await self.queue.put(item, priority)
-        await incr(f"flux.{self.name}.submitted")
+        incr_nowait(self._m["submitted"])
+
+    async def submit_many(self, items: Iterable[T]) -> None:
+        """
+        Добавить пачку элементов одним вызовом через queue.put_many
+        (FIFOQueue и DedupeQueue кладут ее без await на каждый элемент).
+        Метрика submitted - одна на всю пачку.
+        """
+        items = list(items)
+        await self.queue.put_many(items)
+        incr_nowait(self._m["submitted"], len(items))
 
     async def start(self) -> None:
         """
         Запустить обработку очереди. Стартует воркеры
         """
         self._running = True
+        self._idle = asyncio.Event()
         await self.queue.start()
         self._tasks = [
             asyncio.create_task(self._worker(i))
             for i in range(self.config.workers)
         ]
-        await incr(f"flux.{self.name}.started")
+        await incr(self._m["started"])
 
     async def stop(self) -> None:
         """
@@ -85,40 +107,106 @@ class QueueFlux(Generic[T, R]):
         self._running = False
         await asyncio.gather(*self._tasks, return_exceptions=True)
         await self.queue.stop()
-        await incr(f"flux.{self.name}.stopped")
+        await incr(self._m["stopped"])
 
     async def wait_complete(self, timeout: Optional[float] = None) -> bool:
         """
         Ожидать завершения обработки всех элементов в очереди.
 
+        Не опрашивает очередь по таймеру: воркеры сбрасывают событие, когда
+        берут работу, и взводят, когда очередь опустела и ничего не обрабатывается.
+        Сам wait_complete событие не трогает - иначе мог бы затереть set, пришедший
+        между его проверкой и clear.
+
         timeout: макс время ожидания в секундах (None = бесконечно)
         return: True если все обработано, False если таймаут
         """
-        start = time()
-        while True:
-            size = await self.queue.size()
-            if size == 0:
-                await asyncio.sleep(0.1)
-                if await self.queue.size() == 0:
-                    return True
+        if self._idle is None:
+            # не запущен - ждать некого
+            return await self._is_idle()
 
-            if timeout and (time() - start) >= timeout:
-                return False
-
-            await asyncio.sleep(0.1)
+        try:
+            async with _timeout(timeout):
+                while not await self._is_idle():
+                    if self._idle.is_set():
+                        # положили в обход submit, воркер еще не взял - событие
+                        # сбросит он сам, когда возьмет элемент
+                        await asyncio.sleep(0.01)
+                    else:
+                        await self._idle.wait()
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def _is_idle(self) -> bool:
+        """Работы нет: очередь пуста и у воркеров ничего на руках"""
+        return self._active == 0 and await self.queue.size() == 0
+
+    async def _check_idle(self) -> None:
+        """Будим wait_complete, если работа кончилась"""
+        # пока ждали size(), работу мог взять другой воркер - перепроверяем _active
+        if self._idle is not None and await self._is_idle() and not self._active:
+            self._idle.set()
 
     async def _worker(self, wid: int) -> None:
         """
         Воркер - берет элементы из очереди и передает в _process
         """
+        m_errors = f"flux.{self.name}.worker.{wid}.errors"
+        process = self._select_process()
         while self._running:
             try:
-                item = await asyncio.wait_for(self.queue.get(), timeout=1.0)
-                await self._process(item, wid)
+                async with _timeout(1.0):
+                    item = await self.queue.get()
+                self._active += 1
+                self._idle.clear()
+                try:
+                    await process(item, wid)
+                finally:
+                    self._active -= 1
+                    await self._check_idle()
             except asyncio.TimeoutError:
-                continue
+                # очередь могли разобрать не наши воркеры - перепроверяем на простое
+                await self._check_idle()
             except Exception:
-                await incr(f"flux.{self.name}.worker.{wid}.errors")
+                incr_nowait(m_errors)
+
+    def _select_process(self) -> Callable[[T, int], Awaitable[Optional[R]]]:
+        """
+        Выбрать обработчик элемента под текущий конфиг.
+
+        Лимитер, таймаут и кол-во попыток за жизнь воркера не меняются, поэтому
+        для самого частого случая (без лимитера, без таймаута, одна попытка)
+        отдаем _process_plain без проверок на каждый элемент.
+        Наследники со своим _process всегда получают его.
+        """
+        if (
+            type(self)._process is QueueFlux._process
+            and self.limiter is None
+            and not self.config.timeout
+            and self.config.max_retries == 1
+        ):
+            return self._process_plain
+        return self._process
+
+    async def _process_plain(self, item: T, wid: int) -> Optional[R]:
+        """
+        То же, что _process, но без лимитера, таймаута и ретраев
+        """
+        try:
+            result = await self.handler(item)
+        except asyncio.TimeoutError:
+            incr_nowait(self._m["timeout"])
+            return None
+        except Exception:
+            incr_nowait(self._m["errors"])
+            self._stats["failed"] += 1
+            return None
+
+        self._stats["processed"] += 1
+        incr_nowait(self._m["processed"])
+        gauge_nowait(self._m["queue_size"], await self.queue.size())
+        return result
 
     async def _process(self, item: T, wid: int) -> Optional[R]:
         """
@@ -130,39 +218,38 @@ class QueueFlux(Generic[T, R]):
         3. При ошибке - ретрай с экспоненциальной задержкой
         4. Обновить статистику и метрики
         """
-        key = self.config.key_fn(item) if self.config.key_fn else str(hash(item))
-
         if self.limiter:
-            if not await self.limiter.acquire(key):
+            key = self.config.key_fn(item) if self.config.key_fn else self.name
+            acquired, retry_after = await self.limiter.acquire_wait(key)
+            if not acquired:
                 self._stats["rejected"] += 1
-                await incr(f"flux.{self.name}.rejected")
+                incr_nowait(self._m["rejected"])
                 await self.queue.put(item, 0)
-                await asyncio.sleep(0.1)
+                # ждем ровно до появления токенов, а не фиксированные 100мс
+                await asyncio.sleep(retry_after)
                 return None
 
         for attempt in range(self.config.max_retries):
             try:
                 if self.config.timeout:
-                    result = await asyncio.wait_for(
-                        self.handler(item),
-                        timeout=self.config.timeout
-                    )
+                    async with _timeout(self.config.timeout):
+                        result = await self.handler(item)
                 else:
                     result = await self.handler(item)
 
                 self._stats["processed"] += 1
-                await incr(f"flux.{self.name}.processed")
-                await gauge(f"flux.{self.name}.queue_size", await self.queue.size())
+                incr_nowait(self._m["processed"])
+                gauge_nowait(self._m["queue_size"], await self.queue.size())
                 return result
 
             except asyncio.TimeoutError:
-                await incr(f"flux.{self.name}.timeout")
+                incr_nowait(self._m["timeout"])
                 if attempt < self.config.max_retries - 1:
                     await asyncio.sleep(self.config.retry_delay * (attempt + 1))
                 continue
 
             except Exception:
-                await incr(f"flux.{self.name}.errors")
+                incr_nowait(self._m["errors"])
                 if attempt < self.config.max_retries - 1:
                     await asyncio.sleep(self.config.retry_delay * (attempt + 1))
                     continue
@@ -186,6 +273,10 @@ class BatchFlux(QueueFlux[T, R]):
     - прошел batch_timeout с момента последнего флаша
 
     Использует BatchCollector для удобного накопления. Ограничивает параллелизм через семафор.
+
+    Схема: один drainer переливает элементы из очереди в BatchCollector,
+    готовые батчи идут в очередь батчей, а `config.workers` обработчиков
+    забирают их оттуда и параллельно гонят через handler.
     """
 
     def __init__(
@@ -206,25 +297,29 @@ class BatchFlux(QueueFlux[T, R]):
         self.max_concurrent = max_concurrent
         self._sem = asyncio.Semaphore(max_concurrent)
         self._collector = None
+        self._batches: Optional[asyncio.Queue] = None
+        # сколько батчей сейчас в обработке; меняется без await, лок не нужен
         self._processing = 0
-        self._processing_lock = asyncio.Lock()
 
     async def start(self) -> None:
         """
         Запустить батч-обработку. Создает BatchCollector и воркеры
         """
         self._running = True
+        self._idle = asyncio.Event()
         await self.queue.start()
+        # ограниченная - если обработчики не успевают, drainer притормаживает
+        self._batches = asyncio.Queue(maxsize=self.config.workers)
         self._collector = BatchCollector(
             batch_size=self.batch_size,
             timeout=self.batch_timeout,
-            callback=self._process_collected_batch
+            callback=self._batches.put
         )
-        self._tasks = [
-            asyncio.create_task(self._worker(i))
+        self._tasks = [asyncio.create_task(self._drain())] + [
+            asyncio.create_task(self._consume(i))
             for i in range(self.config.workers)
         ]
-        await incr(f"flux.{self.name}.started")
+        await incr(self._m["started"])
 
     async def stop(self) -> None:
         """
@@ -235,44 +330,34 @@ class BatchFlux(QueueFlux[T, R]):
             await self._collector.flush()
         await asyncio.gather(*self._tasks, return_exceptions=True)
         await self.queue.stop()
-        await incr(f"flux.{self.name}.stopped")
+        await incr(self._m["stopped"])
 
     async def wait_complete(self, timeout: Optional[float] = None) -> bool:
         """
         Ожидать завершения обработки всех элементов с учетом батчинга.
 
-        Ждёт пока: 1) очередь пуста, 2) нет активных batch операций.
+        Ждёт пока: 1) очередь пуста, 2) коллектор пуст, 3) нет активных batch операций.
+        Если очередь уже пуста - сразу флашит недобранный батч, не дожидаясь batch_timeout.
 
         timeout: макс время ожидания в секундах (None = бесконечно)
         return: True если все обработано, False если таймаут
         """
-        start = time()
-
-        while True:
-            size = await self.queue.size()
-            async with self._processing_lock:
-                processing = self._processing
-
-            if size == 0 and processing == 0:
-                await asyncio.sleep(self.batch_timeout + 0.2)
-
-                if self._collector:
-                    await self._collector.flush()
-
-                await asyncio.sleep(0.5)
-
-                async with self._processing_lock:
-                    processing = self._processing
+        if self._collector and await self.queue.size() == 0:
+            await self._collector.flush()
 
-                if await self.queue.size() == 0 and processing == 0:
-                    return True
+        done = await super().wait_complete(timeout)
 
-            if timeout and (time() - start) >= timeout:
-                if self._collector:
-                    await self._collector.flush()
-                return False
+        if not done and self._collector:
+            await self._collector.flush()
+        return done
 
-            await asyncio.sleep(0.1)
+    async def _is_idle(self) -> bool:
+        """Плюс к базовому: ни одного батча в обработке и ничего не ждет в коллекторе"""
+        if self._processing or (self._collector and self._collector.pending):
+            return False
+        if self._batches is not None and not self._batches.empty():
+            return False
+        return await super()._is_idle()
 
     async def batch_process(
         self,
@@ -291,98 +376,92 @@ class BatchFlux(QueueFlux[T, R]):
     async def batch_gather(self, *funcs: Callable, batch_size: Optional[int] = None) -> List[Any]:
         return await batch_gather(*funcs, batch_size=batch_size or self.batch_size)
 
-    async def _worker(self, wid: int) -> None:
+    async def batch_gather_pairs(
+        self,
+        pairs: Iterable[Tuple[Callable, Any]],
+        batch_size: Optional[int] = None
+    ) -> List[Any]:
+        return await batch_gather_pairs(pairs, batch_size=batch_size or self.batch_size)
+
+    async def _drain(self) -> None:
         """
-        Воркер для батч-обработки. Накапливает элементы и флашит по условиям
+        Единственный drainer: переливает элементы из очереди в BatchCollector.
+        Флаш по размеру и по таймауту - забота коллектора.
         """
-        batch = []
-        last_flush = time()
-
         while self._running:
             try:
-                item = await asyncio.wait_for(self.queue.get(), timeout=0.1)
+                async with _timeout(0.1):
+                    item = await self.queue.get()
+            except asyncio.TimeoutError:
+                # очередь могли разобрать не мы - перепроверяем на простое
+                await self._check_idle()
+                continue
 
-                if self._collector:
-                    await self._collector.add(item)
-                else:
-                    batch.append(item)
-                    if len(batch) >= self.batch_size or (time() - last_flush) >= self.batch_timeout:
-                        await self._process_batch(batch, wid)
-                        batch = []
-                        last_flush = time()
+            # добираем то, что уже лежит в очереди, одним get_many,
+            # и отдаем коллектору одной пачкой, а не по одному add на элемент
+            items = [item]
+            try:
+                items += await self.queue.get_many(self.batch_size - 1)
 
-            except asyncio.TimeoutError:
-                if batch and (time() - last_flush) >= self.batch_timeout:
-                    await self._process_batch(batch, wid)
-                    batch = []
-                    last_flush = time()
+                # пока add_many ждет лок коллектора, элементы ни в очереди, ни в коллекторе
+                self._active += len(items)
+                self._idle.clear()
+                try:
+                    await self._collector.add_many(items)
+                finally:
+                    self._active -= len(items)
             except Exception:
-                await incr(f"flux.{self.name}.worker.{wid}.errors")
+                incr_nowait(f"flux.{self.name}.drainer.errors")
 
-    async def _process_batch(self, batch: list[T], wid: int) -> None:
+    async def _consume(self, wid: int) -> None:
         """
-        Обработать один батч через handler с учетом лимитера
+        Обработчик батчей. После stop() дорабатывает то, что уже собрано.
         """
-        if not batch:
-            return
-
-        async with self._processing_lock:
-            self._processing += 1
-
-        try:
-            async with self._sem:
-                if self.limiter:
-                    key = f"batch_{wid}"
-                    if not await self.limiter.acquire(key, len(batch)):
-                        await incr(f"flux.{self.name}.rejected")
-                        for item in batch:
-                            await self.queue.put(item, 0)
-                        await asyncio.sleep(0.1)
-                        return
+        m_errors = f"flux.{self.name}.worker.{wid}.errors"
+        while self._running or not self._batches.empty():
+            try:
+                async with _timeout(0.1):
+                    items = await self._batches.get()
+            except asyncio.TimeoutError:
+                continue
 
-                try:
-                    await self._batch_handler(batch)
-                    self._stats["processed"] += len(batch)
-                    await incr(f"flux.{self.name}.processed", len(batch))
-                except Exception:
-                    self._stats["failed"] += len(batch)
-                    await incr(f"flux.{self.name}.errors")
-        finally:
-            async with self._processing_lock:
-                self._processing -= 1
+            try:
+                await self._process_collected_batch(items)
+            except Exception:
+                incr_nowait(m_errors)
 
     async def _process_collected_batch(self, items: List[T]) -> None:
         """
-        Callback для BatchCollector. Обрабатывает накопленный батч
+        Обрабатывает собранный батч через handler с учетом лимитера
         """
         if not items:
             return
 
-        async with self._processing_lock:
-            self._processing += 1
+        self._processing += 1
 
         try:
             async with self._sem:
                 if self.limiter:
-                    key = f"collected_{time()}"
-                    if not await self.limiter.acquire(key, len(items)):
+                    # общий ключ: с уникальным на каждый батч лимитер ничего бы не ограничивал
+                    acquired, retry_after = await self.limiter.acquire_wait(self.name, len(items))
+                    if not acquired:
                         self._stats["rejected"] += len(items)
-                        await incr(f"flux.{self.name}.rejected")
+                        incr_nowait(self._m["rejected"])
                         for item in items:
                             await self.queue.put(item, 0)
-                        await asyncio.sleep(0.1)
+                        await asyncio.sleep(retry_after)
                         return
 
                 try:
                     await self._batch_handler(items)
                     self._stats["processed"] += len(items)
-                    await incr(f"flux.{self.name}.processed", len(items))
+                    incr_nowait(self._m["processed"], len(items))
                 except Exception:
                     self._stats["failed"] += len(items)
-                    await incr(f"flux.{self.name}.errors")
+                    incr_nowait(self._m["errors"])
         finally:
-            async with self._processing_lock:
-                self._processing -= 1
+            self._processing -= 1
+            await self._check_idle()
 
 
 class PriorityFlux(QueueFlux[T, R]):
@@ -402,6 +481,7 @@ class PriorityFlux(QueueFlux[T, R]):
     ):
         super().__init__(queue, handler, None, config, name)
         self.limiters = limiters
+        self._m_priority = {p: f"flux.{name}.p{p}.processed" for p in limiters}
 
     async def submit(self, item: T, priority: int = 0) -> None:
         """
@@ -418,18 +498,22 @@ class PriorityFlux(QueueFlux[T, R]):
         limiter = self.limiters.get(priority)
 
         if limiter:
-            key = self.config.key_fn(item) if self.config.key_fn else str(hash(item))
-            if not await limiter.acquire(key):
+            key = self.config.key_fn(item) if self.config.key_fn else self.name
+            acquired, retry_after = await limiter.acquire_wait(key)
+            if not acquired:
                 await self.queue.put(item, priority)
-                await asyncio.sleep(0.1)
+                await asyncio.sleep(retry_after)
                 return None
 
         try:
             result = await self.handler(item)
             self._stats["processed"] += 1
-            await incr(f"flux.{self.name}.p{priority}.processed")
+            m = self._m_priority.get(priority)
+            if m is None:
+                m = self._m_priority[priority] = f"flux.{self.name}.p{priority}.processed"
+            incr_nowait(m)
             return result
         except Exception:
             self._stats["failed"] += 1
-            await incr(f"flux.{self.name}.errors")
+            incr_nowait(self._m["errors"])
             return None
@@ -1,9 +1,8 @@
-import asyncio
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
 
-from aioflux.utils.common import now
+from aioflux.utils.common import monotonic
 from aioflux.limiters.base import BaseLimiter
-from aioflux.core.metrics import gauge, incr
+from aioflux.core.metrics import gauge_nowait, incr_nowait
 
 
 class AdaptiveLimiter(BaseLimiter):
@@ -16,6 +15,9 @@ class AdaptiveLimiter(BaseLimiter):
     - работает по принципу токен-бакета, но с авто-регулировкой
 
     Используется для автоподстройки под внешние ограничения API или нестабильные системы.
+
+    Все состояние живет в процессе и меняется без await,
+    так что в одном event loop лок не нужен.
     """
 
     def __init__(
@@ -47,47 +49,62 @@ class AdaptiveLimiter(BaseLimiter):
 
         self._success_count = 0
         self._error_count = 0
-        self._last_adjust = now() - window
+        self._last_adjust = monotonic() - window
         self._tokens = initial_rate
-        self._last_refill = now()
-        self._lock = asyncio.Lock()
+        self._last_refill = monotonic()
 
     async def acquire(self, key: str, tokens: float = 1) -> bool:
         """
         Проверка и выдача токенов.
         Успешное получение = "accepted", иначе "rejected".
         """
-        async with self._lock:
-            current = now()
-
-            # пополняем токены со временем
-            elapsed = current - self._last_refill
-            self._tokens = min(
-                self.current_rate,
-                self._tokens + elapsed * self.current_rate
-            )
-            self._last_refill = current
-
-            # хватает токенов — успех
-            if self._tokens >= tokens:
-                self._tokens -= tokens
-                self._success_count += 1
-                await self._adjust_rate()
-                await incr("limiter.adaptive.accepted")
-                return True
+        acquired, _ = await self.acquire_wait(key, tokens)
+        return acquired
 
+    async def acquire_wait(self, key: str, tokens: float = 1) -> Tuple[bool, float]:
+        """
+        То же, что acquire, но при отказе возвращает время до пополнения
+        недостающих токенов по текущей скорости.
+        Каждый отказ считается в статистику ошибок, так что ждать лучше
+        ровно столько, а не опрашивать чаще.
+        """
+        current = monotonic()
+        rate = self.current_rate
+
+        # пополняем токены со временем (в локальных переменных, без min())
+        available = self._tokens + (current - self._last_refill) * rate
+        if available > rate:
+            available = rate
+        self._last_refill = current
+
+        # хватает токенов — успех
+        if available >= tokens:
+            self._tokens = available - tokens
+            self._success_count += 1
+            accepted = True
+        else:
             # не хватило — отказ
+            self._tokens = available
             self._error_count += 1
-            await self._adjust_rate()
-            await incr("limiter.adaptive.rejected")
-            return False
+            accepted = False
 
-    async def _adjust_rate(self) -> None:
+        # окно проверяем на месте - в обычном случае без вызова _adjust_rate
+        if current - self._last_adjust >= self.window:
+            self._adjust_rate(current)
+
+        if accepted:
+            incr_nowait("limiter.adaptive.accepted")
+            return True, 0.0
+        incr_nowait("limiter.adaptive.rejected")
+        return False, (tokens - available) / rate
+
+    def _adjust_rate(self, current: Optional[float] = None) -> None:
         """
         Периодическая корректировка текущей скорости.
         Считаем долю ошибок и либо увеличиваем, либо уменьшаем rate.
         """
-        current = now()
+        if current is None:
+            current = monotonic()
         if current - self._last_adjust < self.window:
             return
 
@@ -110,7 +127,7 @@ class AdaptiveLimiter(BaseLimiter):
                 self.current_rate + self.increase_step
             )
 
-        await gauge("limiter.adaptive.rate", self.current_rate)
+        gauge_nowait("limiter.adaptive.rate", self.current_rate)
 
         self._success_count = 0
         self._error_count = 0
@@ -120,33 +137,45 @@ class AdaptiveLimiter(BaseLimiter):
         """
         Вручную сообщить об ошибке (влияет на адаптацию скорости)
         """
-        async with self._lock:
-            self._error_count += 1
-            await self._adjust_rate()
+        self.report_error_nowait()
+
+    def report_error_nowait(self) -> None:
+        """
+        Синхронный report_error - без корутины на каждый сигнал.
+        Сигналы и так копятся в счетчиках и применяются раз в window,
+        так что тут только инкремент и одно сравнение времени.
+        """
+        self._error_count += 1
+        current = monotonic()
+        if current - self._last_adjust >= self.window:
+            self._adjust_rate(current)
 
     async def report_success(self) -> None:
         """
         Вручную сообщить об успешной операции
         """
-        async with self._lock:
-            self._success_count += 1
-            await self._adjust_rate()
+        self.report_success_nowait()
+
+    def report_success_nowait(self) -> None:
+        """Синхронный report_success (см. report_error_nowait)"""
+        self._success_count += 1
+        current = monotonic()
+        if current - self._last_adjust >= self.window:
+            self._adjust_rate(current)
 
     async def release(self, key: str, tokens: float = 1) -> None:
         """
         Возвращает токены обратно (при отмене операции)
         """
-        async with self._lock:
-            self._tokens = min(self.current_rate, self._tokens + tokens)
+        self._tokens = min(self.current_rate, self._tokens + tokens)
 
     async def get_stats(self, key: str) -> Dict[str, Any]:
         """Возвращает состояние адаптивного лимитера."""
-        async with self._lock:
-            return {
-                "current_rate": self.current_rate,
-                "min_rate": self.min_rate,
-                "max_rate": self.max_rate,
-                "available_tokens": self._tokens,
-                "success_count": self._success_count,
-                "error_count": self._error_count
-            }
+        return {
+            "current_rate": self.current_rate,
+            "min_rate": self.min_rate,
+            "max_rate": self.max_rate,
+            "available_tokens": self._tokens,
+            "success_count": self._success_count,
+            "error_count": self._error_count
+        }
@@ -1,5 +1,6 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
 
 class BaseLimiter(ABC):
@@ -16,6 +17,18 @@ class BaseLimiter(ABC):
         """
         pass
 
+    async def acquire_wait(self, key: str, tokens: float = 1) -> Tuple[bool, float]:
+        """
+        Как acquire, но при отказе еще и говорит, сколько секунд подождать
+        перед следующей попыткой: (acquired, retry_after).
+
+        По умолчанию честно посчитать не можем - советуем опросить снова через 10мс.
+        Лимитеры, которые знают свою скорость пополнения, переопределяют.
+        """
+        if await self.acquire(key, tokens):
+            return True, 0.0
+        return False, 0.01
+
     @abstractmethod
     async def release(self, key: str, tokens: float = 1) -> None:
         """Возвращаем токены обратно (не все лимитеры это поддерживают)"""
@@ -25,3 +38,30 @@ class BaseLimiter(ABC):
     async def get_stats(self, key: str) -> Dict[str, Any]:
         """Получаем статистику по конкретному ключу"""
         pass
+
+
+class LockStripes:
+    """
+    Локи для лимитеров по ключам - фиксированный набор "полос" по хэшу ключа.
+
+    Словарь key -> Lock рос бы с каждым новым ключом и никогда не чистился.
+    Здесь памяти ровно `stripes` локов, выбор - одна индексация по маске.
+    Разные ключи изредка делят лок - для коротких секций это не страшно.
+
+    Сами локи создаем лениво, уже внутри event loop.
+    """
+
+    __slots__ = ("_locks", "_mask")
+
+    def __init__(self, stripes: int = 1024):
+        if stripes & (stripes - 1):
+            raise ValueError("stripes must be a power of two")
+        self._locks: List[Optional[asyncio.Lock]] = [None] * stripes
+        self._mask = stripes - 1
+
+    def get(self, key: str) -> asyncio.Lock:
+        i = hash(key) & self._mask
+        lock = self._locks[i]
+        if lock is None:
+            lock = self._locks[i] = asyncio.Lock()
+        return lock
@@ -1,6 +1,7 @@
 from aioflux.limiters.base import BaseLimiter
-from aioflux.core.metrics import incr
+from aioflux.core.metrics import incr_nowait
 from typing import Dict, Any, List
+import asyncio
 
 
 class CompositeLimiter(BaseLimiter):
@@ -17,26 +18,82 @@ class CompositeLimiter(BaseLimiter):
         ])
 
         → запрос пройдет, только если оба лимитера внутри "ok".
+
+    Если кто-то отклонил - токены, уже списанные остальными, возвращаем (release),
+    иначе отказ одного лимитера зря тратил бы лимит других. Откат работает для
+    лимитеров с настоящим release - все встроенные его умеют (скользящие окна
+    выкидывают последнее событие); release-заглушка во вложенном лимитере
+    оставит списанное списанным.
+
+    При последовательной проверке лимитеры периодически пересортировываются:
+    кто чаще отказывает - тот проверяется первым, чтобы на отказе
+    не дергать (и потом не откатывать) остальные.
     """
 
-    def __init__(self, limiters: List[BaseLimiter]):
+    _REORDER_EVERY = 1024
+
+    def __init__(self, limiters: List[BaseLimiter], *, parallel: bool = False):
         """
         limiters — список объектов, реализующих интерфейс Limiter.
+        parallel — опрашивать лимитеры одновременно (asyncio.gather).
+                   Имеет смысл, когда они ходят в Redis: задержка = max, а не сумма.
+                   Для лимитеров в памяти по очереди дешевле - без тасков на каждый вызов.
+                   Только по имени: лишний лимитер вторым аргументом не должен
+                   молча стать флагом.
         """
         self.limiters = limiters
+        self.parallel = parallel
+        # Порядок проверки (индексы в limiters) и счетчики для его подбора
+        self._order = list(range(len(limiters)))
+        self._checks = [0] * len(limiters)
+        self._rejects = [0] * len(limiters)
+        self._calls = 0
 
     async def acquire(self, key: str, tokens: float = 1) -> bool:
         """
-        Проверяет все лимитеры по очереди.
+        Проверяет все лимитеры.
         Если хотя бы один отклонил — запрос блокируется.
         """
-        for limiter in self.limiters:
-            if not await limiter.acquire(key, tokens):
-                await incr("limiter.composite.rejected")
-                return False
+        if self.parallel:
+            results = await asyncio.gather(*[
+                limiter.acquire(key, tokens) for limiter in self.limiters
+            ])
+            if all(results):
+                incr_nowait("limiter.composite.accepted")
+                return True
+            granted = [l for l, ok in zip(self.limiters, results) if ok]
+        else:
+            self._calls += 1
+            if self._calls >= self._REORDER_EVERY:
+                self._reorder()
+
+            granted = []
+            for i in self._order:
+                limiter = self.limiters[i]
+                self._checks[i] += 1
+                if not await limiter.acquire(key, tokens):
+                    self._rejects[i] += 1
+                    break
+                granted.append(limiter)
+            else:
+                incr_nowait("limiter.composite.accepted")
+                return True
 
-        await incr("limiter.composite.accepted")
-        return True
+        for limiter in granted:
+            await limiter.release(key, tokens)
+        incr_nowait("limiter.composite.rejected")
+        return False
+
+    def _reorder(self) -> None:
+        """
+        Сортирует лимитеры по доле отказов (по убыванию, sort стабильный).
+        Счетчики делим пополам - старая история постепенно забывается.
+        """
+        self._calls = 0
+        checks, rejects = self._checks, self._rejects
+        self._order.sort(key=lambda i: -(rejects[i] / checks[i]) if checks[i] else 0.0)
+        self._checks = [c // 2 for c in checks]
+        self._rejects = [r // 2 for r in rejects]
 
     async def release(self, key: str, tokens: float = 1) -> None:
         """
@@ -0,0 +1,144 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from aioflux.utils.common import SweepTimer, monotonic
+from aioflux.limiters.base import BaseLimiter
+from aioflux.core.metrics import incr_nowait
+
+
+class GCRALimiter(BaseLimiter):
+    """
+    GCRA (Generic Cell Rate Algorithm) - тот же токен-бакет, но состояние
+    ключа - одно число: TAT (theoretical arrival time), момент, к которому
+    бакет снова был бы полон.
+
+    Запрос на n токенов: tat = max(tat, now) + n * interval,
+    пропускаем, если tat - now <= burst * interval.
+    Ни пополнения по времени, ни min() - сложение и сравнение.
+
+    Несколько лимитов сразу (например 100/мин и 1000/час) - это просто
+    несколько TAT на ключ, запрос проходит, если влез во все.
+    В отличие от CompositeLimiter при отказе ничего не откатываем:
+    пока все проверки не прошли, состояние не трогаем.
+
+    Пример:
+        limiter = GCRALimiter([(100, 60, 120), (1000, 3600, None)])
+
+    Все в памяти процесса и без await внутри - как FastTokenBucket,
+    лок не нужен, есть синхронный acquire_nowait.
+
+    Ключ, у которого все TAT уже в прошлом, ничем не отличается от нового
+    (бакеты полные) - такие ключи периодически выкидываем, иначе на ключах
+    вроде IP/юзеров словарь растет бесконечно.
+    """
+
+    def __init__(
+        self,
+        limits: Sequence[Tuple[float, float, Optional[float]]],
+        scope: str = "default"
+    ):
+        """
+        limits — список (rate, per, burst): rate токенов за per секунд,
+                 burst — емкость бакета (None - равна rate)
+        scope — имя набора лимитов (для метрик)
+        """
+        self.limits = list(limits)
+        if not self.limits:
+            raise ValueError("limits must not be empty")
+        self.scope = scope
+        self._m_accepted = f"limiter.{scope}.accepted"
+        self._m_rejected = f"limiter.{scope}.rejected"
+        # (interval, tolerance) на лимит: сколько секунд стоит один токен
+        # и насколько TAT может убежать вперед от now.
+        # Запас в 1e-9 интервала - чтобы сумма интервалов при полном burst
+        # не вылезла за tolerance из-за округления float
+        self._cells: List[Tuple[float, float]] = []
+        for rate, per, burst in self.limits:
+            interval = per / rate
+            self._cells.append((interval, (burst or rate) * interval * (1 + 1e-9)))
+        self._tats: Dict[str, List[float]] = {}
+        # дальше, чем на tolerance, TAT от now не убегает - через столько
+        # простоя любой ключ гарантированно полный
+        self._horizon = max(tolerance for _, tolerance in self._cells)
+        self._sweeper = SweepTimer(self._sweep)
+
+    async def acquire(self, key: str, tokens: float = 1) -> bool:
+        """
+        Проверяет все лимиты ключа.
+        True — влезли во все, False — хотя бы один превышен.
+        """
+        return self._take(key, tokens)[0]
+
+    async def acquire_wait(self, key: str, tokens: float = 1) -> Tuple[bool, float]:
+        """То же, что acquire, плюс точное время до момента, когда запрос пройдет."""
+        return self._take(key, tokens)
+
+    def acquire_nowait(self, key: str, tokens: float = 1) -> bool:
+        """Синхронный acquire - для вызова без await"""
+        return self._take(key, tokens)[0]
+
+    def _take(self, key: str, tokens: float) -> Tuple[bool, float]:
+        current = monotonic()
+        tats = self._tats.get(key)
+        if tats is None:
+            tats = self._tats[key] = [current] * len(self._cells)
+            self._sweeper.schedule(current + self._horizon)
+
+        new_tats = []
+        wait = 0.0
+        for tat, (interval, tolerance) in zip(tats, self._cells):
+            if tat < current:
+                tat = current
+            tat += tokens * interval
+            over = tat - current - tolerance
+            if over > wait:
+                wait = over
+            new_tats.append(tat)
+
+        if wait > 0:
+            incr_nowait(self._m_rejected)
+            return False, wait
+
+        self._tats[key] = new_tats
+        incr_nowait(self._m_accepted)
+        return True, 0.0
+
+    def _sweep(self) -> None:
+        """Удаляем ключи, у которых все TAT в прошлом - для _take они как новые"""
+        current = monotonic()
+        tats = self._tats
+        stale = [k for k, t in tats.items() if max(t) <= current]
+        for k in stale:
+            del tats[k]
+        if tats:
+            self._sweeper.schedule(current + self._horizon)
+
+    async def release(self, key: str, tokens: float = 1) -> None:
+        """Возвращает токены: откатываем TAT каждого лимита назад."""
+        tats = self._tats.get(key)
+        if tats is not None:
+            self._tats[key] = [
+                tat - tokens * interval
+                for tat, (interval, _) in zip(tats, self._cells)
+            ]
+
+    async def get_stats(self, key: str) -> Dict[str, Any]:
+        """
+        Сколько токенов доступно по каждому лимиту и по ключу в целом
+        (минимум по лимитам).
+        """
+        current = monotonic()
+        tats = self._tats.get(key) or [current] * len(self._cells)
+        limits = []
+        for tat, (rate, per, burst), (interval, _) in zip(tats, self.limits, self._cells):
+            max_tokens = burst or rate
+            used = max(tat - current, 0.0) / interval
+            limits.append({
+                "rate": rate,
+                "per": per,
+                "available_tokens": max(max_tokens - used, 0.0),
+                "max_tokens": max_tokens,
+            })
+        return {
+            "available_tokens": min(l["available_tokens"] for l in limits),
+            "limits": limits,
+        }
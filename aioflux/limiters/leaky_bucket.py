@@ -1,11 +1,12 @@
 import asyncio
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 from aioflux.utils.common import now
 from aioflux.core.storage.base import Storage
-from aioflux.limiters.base import BaseLimiter
-from aioflux.core.metrics import gauge, incr
+from aioflux.limiters.base import BaseLimiter, LockStripes
+from aioflux.core.metrics import gauge_nowait, incr_nowait
 from aioflux.core.storage.memory import MemoryStorage
+from aioflux.core.storage.redis_ import RedisStorage
 
 
 class LeakyBucketLimiter(BaseLimiter):
@@ -18,6 +19,42 @@ class LeakyBucketLimiter(BaseLimiter):
     - если ведро переполнено — запрос отклоняется
 
     Применяется для стабилизации нагрузки: выравнивает поток запросов.
+
+    Состояние ведра - одно значение на ключ: (уровень, время последнего обновления).
+    - MemoryStorage: кортеж, чтение-изменение-запись синхронно, без лока;
+    - RedisStorage: строка "level:time", вся логика - один Lua скрипт (1 RTT, атомарно
+      между процессами), ключ сам протухает, когда ведро полностью вытекло;
+    - прочие Storage: та же строка, get + set под локом.
+    """
+
+    _script = """
+    local key = KEYS[1]
+    local rate = tonumber(ARGV[1])
+    local capacity = tonumber(ARGV[2])
+    local tokens = tonumber(ARGV[3])
+    local current = tonumber(ARGV[4])
+
+    local level = 0
+    local last = current
+    local state = redis.call('GET', key)
+    if state then
+        local l, t = string.match(state, '^([^:]+):(.+)$')
+        level = tonumber(l)
+        last = tonumber(t)
+    end
+
+    level = math.max(0, level - (current - last) * rate)
+    local accepted = 0
+    if level + tokens <= capacity then
+        level = math.max(0, level + tokens)
+        accepted = 1
+    end
+
+    -- пустое ведро и отсутствие ключа - одно и то же, так что ключ
+    -- живет ровно столько, сколько ведру вытекать до нуля
+    local ttl = math.ceil(level / rate * 1000) + 1000
+    redis.call('SET', key, tostring(level) .. ':' .. tostring(current), 'PX', ttl)
+    return {accepted, tostring(level)}
     """
 
     def __init__(
@@ -37,12 +74,48 @@ class LeakyBucketLimiter(BaseLimiter):
         self.capacity = capacity
         self.storage = storage or MemoryStorage()
         self.scope = scope
-        self._locks = {}
+        # имена метрик - один раз, а не f-строкой на каждый acquire
+        self._m_accepted = f"limiter.{scope}.accepted"
+        self._m_rejected = f"limiter.{scope}.rejected"
+        self._m_level = f"limiter.{scope}.level"
+        # MemoryStorage отвечает без await - с ним чтение-изменение-запись
+        # атомарны в event loop, и лок не нужен
+        self._sync_storage = isinstance(self.storage, MemoryStorage)
+        self._redis_storage = isinstance(self.storage, RedisStorage)
+        self._script_loaded = False
+        self._locks = LockStripes()
 
     def _get_lock(self, key: str) -> asyncio.Lock:
-        if key not in self._locks:
-            self._locks[key] = asyncio.Lock()
-        return self._locks[key]
+        return self._locks.get(key)
+
+    @staticmethod
+    def _unpack(state: Any) -> Tuple[Optional[float], float]:
+        """(время, уровень) из сохраненного состояния; (None, 0) если его нет"""
+        if state is None:
+            return None, 0
+        if isinstance(state, str):
+            level, last_time = state.split(":")
+            return float(last_time), float(level)
+        return state[1], state[0]
+
+    def _leak(self, level: float, elapsed: float, tokens: float) -> Tuple[bool, float]:
+        """
+        Считаем, сколько "вытекло" за `elapsed`, и пробуем долить `tokens`
+        (отрицательные tokens - вычитаем, для release).
+        Возвращает (влезло ли, новый уровень).
+        """
+        new_level = max(0, level - elapsed * self.rate)
+        if new_level + tokens <= self.capacity:
+            return True, max(0, new_level + tokens)
+        return False, new_level
+
+    def _record(self, accepted: bool, level: float) -> bool:
+        if accepted:
+            incr_nowait(self._m_accepted)
+            gauge_nowait(self._m_level, level)
+        else:
+            incr_nowait(self._m_rejected)
+        return accepted
 
     async def acquire(self, key: str, tokens: float = 1) -> bool:
         """
@@ -50,51 +123,58 @@ class LeakyBucketLimiter(BaseLimiter):
         - Если после утечки хватает места — добавляем и разрешаем.
         - Если переполнено — отклоняем.
         """
-        full_key = f"{self.scope}:{key}"
-        lock = self._get_lock(full_key)
+        acquired, _ = await self.acquire_wait(key, tokens)
+        return acquired
 
-        async with lock:
+    async def acquire_wait(self, key: str, tokens: float = 1) -> Tuple[bool, float]:
+        """
+        То же, что acquire, но при отказе возвращает, через сколько
+        вытечет достаточно, чтобы `tokens` влезли: (level + tokens - capacity) / rate.
+        """
+        accepted, new_level = await self._update(f"{self.scope}:{key}", tokens)
+        self._record(accepted, new_level)
+        if accepted:
+            return True, 0.0
+        return False, (new_level + tokens - self.capacity) / self.rate
+
+    async def _update(self, full_key: str, tokens: float) -> Tuple[bool, float]:
+        """Одно чтение-изменение-запись состояния ведра, способом под конкретный Storage"""
+        if self._sync_storage:
+            storage = self.storage
             current = now()
-
-            last_time = await self.storage.get(f"{full_key}:time")
-            level = await self.storage.get(f"{full_key}:level")
-
+            last_time, level = self._unpack(storage.get_nowait(full_key))
             if last_time is None:
                 last_time = current
-                level = 0
-
-            # считаем, сколько "вытекло" с прошлого раза
-            elapsed = current - last_time
-            leaked = elapsed * self.rate
-            new_level = max(0, level - leaked)
-
-            if new_level + tokens <= self.capacity:
-                # добавляем токены — запрос разрешен
-                new_level += tokens
-                await self.storage.set(f"{full_key}:level", new_level)
-                await self.storage.set(f"{full_key}:time", current)
-                await incr(f"limiter.{self.scope}.accepted")
-                await gauge(f"limiter.{self.scope}.level", new_level)
-                return True
-
-            # не хватило места — отклоняем
-            await self.storage.set(f"{full_key}:level", new_level)
-            await self.storage.set(f"{full_key}:time", current)
-            await incr(f"limiter.{self.scope}.rejected")
-            return False
+            accepted, new_level = self._leak(level, current - last_time, tokens)
+            storage.set_nowait(full_key, (new_level, current))
+            return accepted, new_level
+
+        if self._redis_storage:
+            if not self._script_loaded:
+                await self.storage.register_script(self._script)
+                self._script_loaded = True
+            accepted, new_level = await self.storage.eval_script(
+                self._script,
+                [full_key],
+                [self.rate, self.capacity, tokens, now()]
+            )
+            return accepted == 1, float(new_level)
+
+        async with self._get_lock(full_key):
+            current = now()
+            last_time, level = self._unpack(await self.storage.get(full_key))
+            if last_time is None:
+                last_time = current
+            accepted, new_level = self._leak(level, current - last_time, tokens)
+            await self.storage.set(full_key, f"{new_level}:{current}")
+            return accepted, new_level
 
     async def release(self, key: str, tokens: float = 1) -> None:
         """
         Принудительно "выпускает" часть токенов (уменьшает уровень).
         Используется редко — в основном для ручного сброса нагрузки.
         """
-        full_key = f"{self.scope}:{key}"
-        lock = self._get_lock(full_key)
-
-        async with lock:
-            level = await self.storage.get(f"{full_key}:level") or 0
-            new_level = max(0, level - tokens)
-            await self.storage.set(f"{full_key}:level", new_level)
+        await self._update(f"{self.scope}:{key}", -tokens)
 
     async def get_stats(self, key: str) -> Dict[str, Any]:
         """
@@ -104,12 +184,11 @@ class LeakyBucketLimiter(BaseLimiter):
         - скорость утечки
         """
         full_key = f"{self.scope}:{key}"
-        level = await self.storage.get(f"{full_key}:level") or 0
-        last_time = await self.storage.get(f"{full_key}:time") or now()
+        last_time, level = self._unpack(await self.storage.get(full_key))
 
         return {
             "current_level": level,
             "capacity": self.capacity,
             "leak_rate": self.rate,
-            "last_update": last_time
+            "last_update": last_time if last_time is not None else now()
         }
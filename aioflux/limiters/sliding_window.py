@@ -1,15 +1,44 @@
-import asyncio
-from bisect import bisect_left, insort
-from typing import Any, Dict, List, Optional
+from collections import deque
+from itertools import count
+from uuid import uuid4
+from typing import Any, Deque, Dict, Optional
 
-from aioflux.utils.common import now
+from aioflux.utils.common import SweepTimer, monotonic, now
 from aioflux.core.storage.base import Storage
 from aioflux.limiters.base import BaseLimiter
-from aioflux.core.metrics import incr
+from aioflux.core.metrics import incr_nowait
 from aioflux.core.storage.memory import MemoryStorage
 from aioflux.core.storage.redis_ import RedisStorage
 
 
+class _Counter:
+    """
+    Состояние ключа в приближенном режиме SlidingWindowLimiter:
+    номер текущего фиксированного окна и счетчики текущего и предыдущего.
+    """
+
+    __slots__ = ("idx", "cur", "prev")
+
+    def __init__(self, idx: int):
+        self.idx = idx
+        self.cur = 0
+        self.prev = 0
+
+    def estimate(self, pos: float) -> float:
+        """
+        Сколько событий в скользящем окне, заканчивающемся в `pos`
+        (время в единицах окна). Предыдущее окно берем с весом той его части,
+        что еще попадает в скользящее.
+        """
+        idx = int(pos)
+        if idx != self.idx:
+            # соседнее окно - текущий счетчик становится предыдущим, иначе оба протухли
+            self.prev = self.cur if idx == self.idx + 1 else 0
+            self.cur = 0
+            self.idx = idx
+        return self.prev * (1 - (pos - idx)) + self.cur
+
+
 class SlidingWindowLimiter(BaseLimiter):
     """
     Лимитер на основе скользящего окна (sliding window).
@@ -18,6 +47,11 @@ class SlidingWindowLimiter(BaseLimiter):
     В отличие от токен-бакета, хранит реальные отметки времени событий
     и позволяет более точно считать лимит.
 
+    approximate=True - вместо отметок два счетчика на ключ (текущее и прошлое
+    фиксированное окно, прошлое - с весом перекрытия). O(1) и пара int'ов
+    памяти на ключ вместо до `rate` отметок, но лимит считается приближенно
+    (события внутри прошлого окна считаются равномерными).
+
     Пример:
         rate=5, per=1.0 → максимум 5 событий за последнюю секунду.
     """
@@ -27,71 +61,146 @@ class SlidingWindowLimiter(BaseLimiter):
         rate: float,
         per: float = 1.0,
         storage: Optional[Storage] = None,
-        scope: str = "default"
+        scope: str = "default",
+        approximate: bool = False
     ):
         """
         rate — максимально допустимое число событий за интервал
         per — длительность окна (в секундах)
         storage — хранилище (по умолчанию память)
         scope — имя набора лимитов (для метрик)
+        approximate — считать по двум счетчикам вместо отметок времени
         """
         self.rate = rate
         self.per = per
         self.storage = storage or MemoryStorage()
         self.scope = scope
-        self._windows: Dict[str, List[float]] = {}
-        self._lock = asyncio.Lock()
+        self._m_accepted = f"limiter.{scope}.accepted"
+        self._m_rejected = f"limiter.{scope}.rejected"
+        self._inv_per = 1.0 / per
+        # окна живут в этом экземпляре, а не в общем storage - ключуем их
+        # просто по key, без f-строки со scope на каждый вызов.
+        # monotonic() не убывает, так что отметки в окне уже отсортированы:
+        # старые выкидываем слева, новые дописываем справа.
+        # Лока нет: внутри acquire нет await, окно меняется атомарно
+        self._windows: Dict[str, Deque[float]] = {}
+        self.approximate = approximate
+        self._counters: Dict[str, _Counter] = {}
+        self._sweeper = SweepTimer(self._sweep)
 
     async def acquire(self, key: str, tokens: float = 1) -> bool:
         """
         Проверяет, можно ли разрешить событие для данного ключа.
         Удаляет старые записи, добавляет текущую, если лимит не превышен.
         """
-        full_key = f"{self.scope}:{key}"
-        current = now()
+        current = monotonic()
+        if self.approximate:
+            return self._acquire_approx(key, current)
         cutoff = current - self.per
 
-        async with self._lock:
-            if full_key not in self._windows:
-                self._windows[full_key] = []
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = deque()
+            self._schedule_sweep()
+
+        # очищаем старые значения (до cutoff)
+        while window and window[0] < cutoff:
+            window.popleft()
 
-            window = self._windows[full_key]
+        # если ещё можно — добавляем текущее событие
+        if len(window) < self.rate:
+            window.append(current)
+            incr_nowait(self._m_accepted)
+            return True
 
-            # очищаем старые значения (до cutoff)
-            idx = bisect_left(window, cutoff)
-            self._windows[full_key] = window[idx:]
+        incr_nowait(self._m_rejected)
+        return False
 
-            # если ещё можно — добавляем текущее событие
-            if len(self._windows[full_key]) < self.rate:
-                insort(self._windows[full_key], current)
-                await incr(f"limiter.{self.scope}.accepted")
-                return True
+    def _acquire_approx(self, key: str, current: float) -> bool:
+        pos = current * self._inv_per
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters[key] = _Counter(int(pos))
+            self._schedule_sweep()
 
-            await incr(f"limiter.{self.scope}.rejected")
-            return False
+        if counter.estimate(pos) < self.rate:
+            counter.cur += 1
+            incr_nowait(self._m_accepted)
+            return True
+
+        incr_nowait(self._m_rejected)
+        return False
+
+    def _schedule_sweep(self) -> None:
+        """Ставим чистку старых окон, если она еще не запланирована"""
+        self._sweeper.schedule(monotonic() + self.per * 10)
+
+    def _sweep(self) -> None:
+        """
+        Удаляем окна ключей, по которым за последний период ничего не было -
+        иначе на ключах вроде IP/юзеров словарь растет бесконечно.
+        Пустое окно и отсутствие окна для acquire/get_stats - одно и то же.
+        """
+        current = monotonic()
+        cutoff = current - self.per
+        windows = self._windows
+        stale = [k for k, w in windows.items() if not w or w[-1] < cutoff]
+        for k in stale:
+            del windows[k]
+
+        # счетчик старше прошлого окна уже ничего не весит
+        idx = int(current * self._inv_per)
+        counters = self._counters
+        stale = [k for k, c in counters.items() if c.idx < idx - 1]
+        for k in stale:
+            del counters[k]
+
+        if windows or counters:
+            self._schedule_sweep()
 
     async def release(self, key: str, tokens: float = 1) -> None:
-        """Не используется (ограничение по времени, не по возврату токенов)."""
-        pass
+        """
+        Откатывает последнее событие ключа - acquire пишет одно событие
+        на вызов, столько же и возвращаем (нужно CompositeLimiter при отказе соседа).
+        """
+        if self.approximate:
+            counter = self._counters.get(key)
+            if counter is None:
+                return
+            # окно могло смениться после acquire - тогда событие уже в prev
+            counter.estimate(monotonic() * self._inv_per)
+            if counter.cur:
+                counter.cur -= 1
+            elif counter.prev:
+                counter.prev -= 1
+            return
+
+        window = self._windows.get(key)
+        if window:
+            window.pop()
 
     async def get_stats(self, key: str) -> Dict[str, Any]:
         """
         Возвращает текущее состояние окна:
         сколько событий сейчас в пределах периода, сколько осталось до лимита.
         """
-        full_key = f"{self.scope}:{key}"
-        async with self._lock:
-            window = self._windows.get(full_key, [])
-            current = now()
+        current = monotonic()
+        if self.approximate:
+            counter = self._counters.get(key)
+            used = counter.estimate(current * self._inv_per) if counter is not None else 0
+        else:
+            window = self._windows.get(key, ())
             cutoff = current - self.per
-            valid = [t for t in window if t >= cutoff]
+            while window and window[0] < cutoff:
+                window.popleft()
+            used = len(window)
 
-            return {
-                "current_count": len(valid),
-                "max_count": self.rate,
-                "window_seconds": self.per,
-                "available": self.rate - len(valid)
-            }
+        return {
+            "current_count": used,
+            "max_count": self.rate,
+            "window_seconds": self.per,
+            "available": self.rate - used
+        }
 
 
 class RedisSlidingWindow(BaseLimiter):
@@ -100,6 +209,37 @@ class RedisSlidingWindow(BaseLimiter):
 
     Redis хранит временные метки событий с сортировкой по времени.
     Старые события удаляются, и проверяется количество за окно.
+
+    Весь цикл ZREMRANGEBYSCORE + ZCARD + ZADD + PEXPIRE - один Lua скрипт,
+    он грузится в Redis при первом acquire и дальше зовется по SHA (EVALSHA).
+
+    Член ZSET - уникальная строка, а не само время: два события с одной
+    отметкой иначе схлопнулись бы в одно и не посчитались.
+    Ключ живет одно окно после последнего события - дольше он не нужен.
+    """
+
+    _script = """
+    local key = KEYS[1]
+    local cutoff = tonumber(ARGV[1])
+    local current = tonumber(ARGV[2])
+    local rate = tonumber(ARGV[3])
+    local member = ARGV[4]
+    local window_ms = tonumber(ARGV[5])
+
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', cutoff)
+    local count = redis.call('ZCARD', key)
+
+    if count < rate then
+        redis.call('ZADD', key, current, member)
+        redis.call('PEXPIRE', key, window_ms)
+        return 1
+    end
+    return 0
+    """
+
+    _release_script = """
+    redis.call('ZPOPMAX', KEYS[1])
+    return 1
     """
 
     def __init__(
@@ -119,6 +259,13 @@ class RedisSlidingWindow(BaseLimiter):
         self.per = per
         self.storage = storage
         self.scope = scope
+        self._m_accepted = f"limiter.{scope}.accepted"
+        self._m_rejected = f"limiter.{scope}.rejected"
+        self._script_loaded = False
+        self._window_ms = int(per * 1000) + 1
+        # префикс инстанса + счетчик - уникальные члены ZSET без uuid на каждый вызов
+        self._member_prefix = uuid4().hex[:12]
+        self._seq = count()
 
     async def acquire(self, key: str, tokens: float = 1) -> bool:
         """
@@ -133,39 +280,33 @@ class RedisSlidingWindow(BaseLimiter):
         full_key = f"{self.scope}:{key}"
         current = now()
         cutoff = current - self.per
+        member = f"{self._member_prefix}:{next(self._seq)}"
 
-        script = """
-        local key = KEYS[1]
-        local cutoff = tonumber(ARGV[1])
-        local current = tonumber(ARGV[2])
-        local rate = tonumber(ARGV[3])
-
-        redis.call('ZREMRANGEBYSCORE', key, '-inf', cutoff)
-        local count = redis.call('ZCARD', key)
-
-        if count < rate then
-            redis.call('ZADD', key, current, current)
-            redis.call('EXPIRE', key, 3600)
-            return 1
-        end
-        return 0
-        """
+        if not self._script_loaded:
+            await self.storage.register_script(self._script)
+            self._script_loaded = True
 
         result = await self.storage.eval_script(
-            script,
+            self._script,
             [full_key],
-            [cutoff, current, self.rate]
+            [cutoff, current, self.rate, member, self._window_ms]
         )
 
         if result == 1:
-            await incr(f"limiter.{self.scope}.accepted")
+            incr_nowait(self._m_accepted)
             return True
 
-        await incr(f"limiter.{self.scope}.rejected")
+        incr_nowait(self._m_rejected)
         return False
 
     async def release(self, key: str, tokens: float = 1) -> None:
-        pass
+        """
+        Откатывает последнее событие ключа (ZPOPMAX - самый свежий член).
+        Чей именно член - неважно, в окне считается только их количество.
+        """
+        if not self.storage:
+            return
+        await self.storage.eval_script(self._release_script, [f"{self.scope}:{key}"], [])
 
     async def get_stats(self, key: str) -> Dict[str, Any]:
         """
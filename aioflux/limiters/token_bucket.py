@@ -1,11 +1,12 @@
 import asyncio
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from aioflux.utils.common import now
+from aioflux.utils.common import SweepTimer, monotonic, now
 from aioflux.core.storage.base import Storage
-from aioflux.limiters.base import BaseLimiter
-from aioflux.core.metrics import gauge, incr
+from aioflux.limiters.base import BaseLimiter, LockStripes
+from aioflux.core.metrics import gauge_nowait, incr_nowait
 from aioflux.core.storage.memory import MemoryStorage
+from aioflux.core.storage.redis_ import RedisStorage
 
 
 class TokenBucketLimiter(BaseLimiter):
@@ -25,15 +26,84 @@ class TokenBucketLimiter(BaseLimiter):
     - limiter.<scope>.accepted — разрешенные запросы
     - limiter.<scope>.rejected — отклоненные запросы
     - limiter.<scope>.tokens — текущее количество токенов
+
+    С RedisStorage пополнение и списание - один Lua скрипт (1 RTT вместо
+    четырех get/set, атомарно между процессами, без Python-лока).
+    Ключи те же `<key>:time` и `<key>:tokens`, так что get_stats читает их как обычно.
+    """
+
+    _script = """
+    local last = tonumber(redis.call('GET', KEYS[1]))
+    local cur = tonumber(redis.call('GET', KEYS[2]))
+    local current = tonumber(ARGV[1])
+    local refill_rate = tonumber(ARGV[2])
+    local need = tonumber(ARGV[3])
+    local burst = tonumber(ARGV[4])
+
+    if last == nil or cur == nil then
+        last = current
+        cur = burst
+    end
+
+    local new = math.min(burst, cur + (current - last) * refill_rate)
+    local accepted = 0
+    -- отрицательный need - это release, он проходит всегда
+    if new >= need then
+        new = math.min(burst, new - need)
+        accepted = 1
+    end
+
+    redis.call('SET', KEYS[1], tostring(current))
+    redis.call('SET', KEYS[2], tostring(new))
+    return {accepted, tostring(new)}
+    """
+
+    # Несколько бакетов за один вызов (см. acquire_all).
+    # KEYS - пары (time, tokens), ARGV - now, need и пары (refill_rate, burst).
+    # Списываем только если хватило во всех, иначе ничего не пишем:
+    # пополнение - функция от времени, следующий вызов досчитает его сам.
+    _multi_script = """
+    local current = tonumber(ARGV[1])
+    local need = tonumber(ARGV[2])
+    local levels = {}
+
+    for i = 1, #KEYS / 2 do
+        local last = tonumber(redis.call('GET', KEYS[2 * i - 1]))
+        local cur = tonumber(redis.call('GET', KEYS[2 * i]))
+        local refill_rate = tonumber(ARGV[2 * i + 1])
+        local burst = tonumber(ARGV[2 * i + 2])
+
+        if last == nil or cur == nil then
+            last = current
+            cur = burst
+        end
+
+        local new = math.min(burst, cur + (current - last) * refill_rate)
+        if new < need then
+            return {i, tostring(new)}
+        end
+        levels[i] = new - need
+    end
+
+    local result = {0}
+    for i = 1, #levels do
+        redis.call('SET', KEYS[2 * i - 1], tostring(current))
+        redis.call('SET', KEYS[2 * i], tostring(levels[i]))
+        result[i + 1] = tostring(levels[i])
+    end
+    return result
     """
 
+    _KEY_CACHE_SIZE = 4096
+
     def __init__(
         self,
         rate: float,
         per: float = 1.0,
         burst: Optional[float] = None,
         storage: Optional[Storage] = None,
-        scope: str = "default"
+        scope: str = "default",
+        local_batch: float = 0
     ):
         """
         rate — сколько токенов добавляем за интервал `per`
@@ -41,20 +111,62 @@ class TokenBucketLimiter(BaseLimiter):
         burst — максимальное число токенов в бакете
         storage — хранилище для токенов (Redis, память и т.д.)
         scope — имя набора лимитов (для метрик)
+        local_batch — сколько токенов забирать из storage за раз и раздавать
+            локально без запросов (0 - выключено). Меньше походов в Redis,
+            но токены в резерве одного процесса не видны другим.
         """
         self.rate = rate
         self.per = per
         self.burst = burst or rate
         self.storage = storage or MemoryStorage()
         self.scope = scope
+        self._m_accepted = f"limiter.{scope}.accepted"
+        self._m_rejected = f"limiter.{scope}.rejected"
+        self._m_tokens = f"limiter.{scope}.tokens"
         self._refill_rate = rate / per
-        self._locks = {}
+        # для retry_after: умножение вместо деления на каждый отказ
+        self._inv_refill = per / rate
+        self._redis_storage = isinstance(self.storage, RedisStorage)
+        self._script_loaded = False
+        self._locks = LockStripes()
+        self.local_batch = local_batch
+        # ключ -> (осталось в резерве, до какого monotonic() он действует).
+        # Протухшие резервы периодически выкидываем - иначе словарь растет
+        # с числом ключей
+        self._reserved: Dict[str, Tuple[float, float]] = {}
+        self._reserve_sweeper = SweepTimer(self._sweep_reserved)
+        # ключи в storage для одного и того же key собираем один раз:
+        # горячие ключи повторяются, а это три f-строки на каждый вызов.
+        # Обычный dict, а не lru_cache на bound-методе - тот держал бы ссылку
+        # на self (цикл), а его хит стоит почти как сами f-строки
+        self._key_cache: Dict[str, Tuple[str, str, str]] = {}
 
     def _get_lock(self, key: str) -> asyncio.Lock:
-        """Возвращает лок на ключ (создает при первом обращении)"""
-        if key not in self._locks:
-            self._locks[key] = asyncio.Lock()
-        return self._locks[key]
+        """Возвращает лок на ключ (полоса по хэшу, память не растет с числом ключей)"""
+        return self._locks.get(key)
+
+    def _keys(self, key: str) -> Tuple[str, str, str]:
+        """(полный ключ, ключ времени, ключ токенов)"""
+        keys = self._key_cache.get(key)
+        if keys is None:
+            if len(self._key_cache) >= self._KEY_CACHE_SIZE:
+                # переполнение - начинаем заново: горячие ключи быстро вернутся
+                self._key_cache.clear()
+            full_key = f"{self.scope}:{key}"
+            keys = self._key_cache[key] = (full_key, f"{full_key}:time", f"{full_key}:tokens")
+        return keys
+
+    async def _eval(self, keys: Tuple[str, str, str], tokens: float) -> Tuple[bool, float]:
+        """Пополнение и списание в Redis одним скриптом: (списали ли, осталось токенов)"""
+        if not self._script_loaded:
+            await self.storage.register_script(self._script)
+            self._script_loaded = True
+        accepted, new_tokens = await self.storage.eval_script(
+            self._script,
+            [keys[1], keys[2]],
+            [now(), self._refill_rate, tokens, self.burst]
+        )
+        return accepted == 1, float(new_tokens)
 
     async def acquire(self, key: str, tokens: float = 1) -> bool:
         """
@@ -62,14 +174,134 @@ class TokenBucketLimiter(BaseLimiter):
         Если хватает — уменьшаем счетчик и пропускаем.
         Если нет — отклоняем.
         """
-        full_key = f"{self.scope}:{key}"
-        lock = self._get_lock(full_key)
+        acquired, _ = await self.acquire_wait(key, tokens)
+        return acquired
 
-        async with lock:
+    async def acquire_wait(self, key: str, tokens: float = 1) -> Tuple[bool, float]:
+        """
+        То же, что acquire, но при отказе возвращает время до пополнения
+        недостающих токенов: (tokens - available) / refill_rate.
+        """
+        keys = self._keys(key)
+        if self.local_batch:
+            return await self._acquire_reserved(keys, tokens)
+        accepted, new_tokens = await self._take(keys, tokens)
+        return self._record(accepted, tokens, new_tokens)
+
+    @staticmethod
+    async def acquire_all(
+        checks: Sequence[Tuple["TokenBucketLimiter", str]],
+        tokens: float = 1
+    ) -> Optional[int]:
+        """
+        Списываем `tokens` сразу из нескольких бакетов: [(limiter, key), ...].
+        Все или ничего - если хоть один отказал, остальные не тратятся.
+
+        Возвращает None если прошли все, иначе индекс первого отказавшего в checks.
+
+        Если все лимитеры на одном RedisStorage (и без local_batch) -
+        один Lua скрипт на все бакеты: 1 RTT вместо N, атомарно.
+        Иначе - по очереди, с release уже списанного при отказе.
+        """
+        storage = checks[0][0].storage if checks else None
+        if (
+            isinstance(storage, RedisStorage)
+            and all(l.storage is storage and not l.local_batch for l, _ in checks)
+        ):
+            keys: List[str] = []
+            args: List[Any] = [now(), tokens]
+            for limiter, key in checks:
+                _, time_key, tokens_key = limiter._keys(key)
+                keys += (time_key, tokens_key)
+                args += (limiter._refill_rate, limiter.burst)
+
+            result = await storage.eval_script(TokenBucketLimiter._multi_script, keys, args)
+            failed = int(result[0])
+            if failed:
+                checks[failed - 1][0]._record(False, tokens, float(result[1]))
+                return failed - 1
+            for (limiter, _), level in zip(checks, result[1:]):
+                limiter._record(True, tokens, float(level))
+            return None
+
+        granted = []
+        for i, (limiter, key) in enumerate(checks):
+            if not await limiter.acquire(key, tokens):
+                for l, k in granted:
+                    await l.release(k, tokens)
+                return i
+            granted.append((limiter, key))
+        return None
+
+    async def _acquire_reserved(self, keys: Tuple[str, str, str], tokens: float) -> Tuple[bool, float]:
+        """
+        Берем из локального резерва без await; кончился - забираем из storage
+        сразу local_batch токенов. Резерв живет `per` секунд, чтобы токены
+        не залеживались у процесса, который перестал их тратить.
+        """
+        full_key = keys[0]
+        left, expires_at = self._reserved.get(full_key, (0.0, 0.0))
+        if left >= tokens and monotonic() < expires_at:
+            self._reserved[full_key] = (left - tokens, expires_at)
+            incr_nowait(self._m_accepted)
+            return True, 0.0
+
+        batch = max(tokens, self.local_batch)
+        accepted, new_tokens = await self._take(keys, batch)
+        if not accepted and batch > tokens:
+            # на целую пачку не хватило - может, хватит на сам запрос
+            batch = tokens
+            accepted, new_tokens = await self._take(keys, batch)
+
+        if accepted and batch > tokens:
+            # старый остаток сгорает - лучше недодать, чем пропустить лишнее
+            expires_at = monotonic() + self.per
+            self._reserved[full_key] = (batch - tokens, expires_at)
+            self._reserve_sweeper.schedule(expires_at)
+        else:
+            self._reserved.pop(full_key, None)
+        return self._record(accepted, tokens, new_tokens)
+
+    def _sweep_reserved(self) -> None:
+        """Удаляем протухшие резервы - их остаток и так уже не выдается"""
+        current = monotonic()
+        reserved = self._reserved
+        stale = [k for k, (_, expires_at) in reserved.items() if expires_at <= current]
+        for k in stale:
+            del reserved[k]
+        if reserved:
+            self._reserve_sweeper.schedule(current + self.per)
+
+    async def release_reserved(self) -> None:
+        """
+        Возвращаем в storage все неистраченные локальные резервы - например
+        перед остановкой процесса, чтобы эти токены могли взять другие.
+        """
+        reserved, self._reserved = self._reserved, {}
+        current = monotonic()
+        for full_key, (left, expires_at) in reserved.items():
+            if left > 0 and expires_at > current:
+                await self._release((full_key, f"{full_key}:time", f"{full_key}:tokens"), left)
+
+    def _record(self, accepted: bool, tokens: float, new_tokens: float) -> Tuple[bool, float]:
+        if accepted:
+            incr_nowait(self._m_accepted)
+            gauge_nowait(self._m_tokens, new_tokens)
+            return True, 0.0
+        incr_nowait(self._m_rejected)
+        return False, (tokens - new_tokens) * self._inv_refill
+
+    async def _take(self, keys: Tuple[str, str, str], tokens: float) -> Tuple[bool, float]:
+        """Пополнить бакет по времени и попробовать списать: (списали ли, осталось токенов)"""
+        if self._redis_storage:
+            return await self._eval(keys, tokens)
+
+        full_key, time_key, tokens_key = keys
+        async with self._get_lock(full_key):
             current_time = now()
 
-            last_time = await self.storage.get(f"{full_key}:time")
-            last_tokens = await self.storage.get(f"{full_key}:tokens")
+            last_time = await self.storage.get(time_key)
+            last_tokens = await self.storage.get(tokens_key)
 
             if last_time is None:
                 last_time = current_time
@@ -78,39 +310,46 @@ class TokenBucketLimiter(BaseLimiter):
             elapsed = current_time - last_time
             new_tokens = min(self.burst, last_tokens + elapsed * self._refill_rate)
 
-            if new_tokens >= tokens:
+            accepted = new_tokens >= tokens
+            if accepted:
                 new_tokens -= tokens
-                await self.storage.set(f"{full_key}:tokens", new_tokens)
-                await self.storage.set(f"{full_key}:time", current_time)
-                await incr(f"limiter.{self.scope}.accepted")
-                await gauge(f"limiter.{self.scope}.tokens", new_tokens)
-                return True
-
-            await self.storage.set(f"{full_key}:tokens", new_tokens)
-            await self.storage.set(f"{full_key}:time", current_time)
-            await incr(f"limiter.{self.scope}.rejected")
-            return False
+            await self.storage.set(tokens_key, new_tokens)
+            await self.storage.set(time_key, current_time)
+            return accepted, new_tokens
 
     async def release(self, key: str, tokens: float = 1) -> None:
         """Возврат токенов обратно в бакет."""
-        k = f"{self.scope}:{key}"
+        await self._release(self._keys(key), tokens)
+
+    async def _release(self, keys: Tuple[str, str, str], tokens: float) -> None:
+        if self._redis_storage:
+            _, new = await self._eval(keys, -tokens)
+            gauge_nowait(self._m_tokens, new)
+            return
+
+        k, time_key, tokens_key = keys
         lock = self._get_lock(k)
         async with lock:
             t = now()
-            last_t = await self.storage.get(f"{k}:time") or t
-            cur = await self.storage.get(f"{k}:tokens") or self.burst
+            last_t = await self.storage.get(time_key)
+            cur = await self.storage.get(tokens_key)
+            # пустой бакет (0 токенов) - это не "нет состояния", через `or` его не проверить
+            if last_t is None or cur is None:
+                last_t, cur = t, self.burst
             elapsed = t - last_t
             new = min(self.burst, cur + elapsed * self._refill_rate + tokens)
-            await self.storage.set(f"{k}:tokens", new)
-            await self.storage.set(f"{k}:time", t)
-            await gauge(f"limiter.{self.scope}.tokens", new)
+            await self.storage.set(tokens_key, new)
+            await self.storage.set(time_key, t)
+            gauge_nowait(self._m_tokens, new)
 
     async def get_stats(self, key: str) -> Dict[str, Any]:
         """Возвращает состояние ведра."""
-        k = f"{self.scope}:{key}"
+        _, time_key, tokens_key = self._keys(key)
         t = now()
-        last_t = await self.storage.get(f"{k}:time") or t
-        cur = await self.storage.get(f"{k}:tokens") or self.burst
+        last_t = await self.storage.get(time_key)
+        cur = await self.storage.get(tokens_key)
+        if last_t is None or cur is None:
+            last_t, cur = t, self.burst
         avail = min(self.burst, cur + (t - last_t) * self._refill_rate)
         return {
             "available_tokens": avail,
@@ -120,6 +359,31 @@ class TokenBucketLimiter(BaseLimiter):
         }
 
 
+class _Bucket:
+    """
+    Состояние одного ведра FastTokenBucket.
+    Слоты вместо dict - без хэширования строковых ключей "tokens"/"time" на каждый acquire.
+    """
+
+    __slots__ = ("tokens", "time")
+
+    def __init__(self, tokens: float, time: float):
+        self.tokens = tokens
+        self.time = time
+
+    def take(self, need: float, current: float, burst: float, refill_rate: float) -> bool:
+        """Пополняем по прошедшему времени и пробуем забрать `need` токенов"""
+        tokens = self.tokens + (current - self.time) * refill_rate
+        if tokens > burst:
+            tokens = burst
+        self.time = current
+        if tokens >= need:
+            self.tokens = tokens - need
+            return True
+        self.tokens = tokens
+        return False
+
+
 class FastTokenBucket(BaseLimiter):
     """
     Упрощённый и очень быстрый вариант токен-бакета.
@@ -131,6 +395,10 @@ class FastTokenBucket(BaseLimiter):
     - высокая производительность (всё синхронно в памяти)
     - подходит для высоконагруженных потоков
     - не гарантирует глобальную консистентность между процессами
+
+    Вся работа - арифметика над ведром без await, поэтому есть и синхронный
+    acquire_nowait (без корутины на вызов). Атомарность держится на том, что
+    ведро трогает один event loop; из нескольких потоков звать нельзя.
     """
 
     def __init__(self, rate: float, per: float = 1.0, burst: Optional[float] = None):
@@ -143,44 +411,51 @@ class FastTokenBucket(BaseLimiter):
         self.per = per
         self.burst = burst or rate
         self._refill_rate = rate / per
-        self._buckets: Dict[str, Dict[str, float]] = {}
-        self._lock = asyncio.Lock()
+        self._inv_refill = per / rate
+        # между чтением и записью ведра нет await - в одном event loop это
+        # атомарно, так что ни общий лок, ни локи по ключам не нужны
+        self._buckets: Dict[str, _Bucket] = {}
 
     async def acquire(self, key: str, tokens: float = 1) -> bool:
         """
         Проверяет, можно ли взять `tokens` токенов.
         Возвращает True — разрешено, False — превышен лимит.
         """
-        async with self._lock:
-            current = now()
+        return self._take(key, tokens)[0]
+
+    async def acquire_wait(self, key: str, tokens: float = 1) -> Tuple[bool, float]:
+        """То же, что acquire, плюс время до пополнения недостающих токенов."""
+        return self._take(key, tokens)
+
+    def acquire_nowait(self, key: str, tokens: float = 1) -> bool:
+        """Синхронный acquire - для вызова без await"""
+        return self._take(key, tokens)[0]
 
-            bucket = self._buckets.setdefault(key, {"tokens": self.burst, "time": current})
+    def _take(self, key: str, tokens: float) -> Tuple[bool, float]:
+        current = monotonic()
 
-            elapsed = current - bucket["time"]
-            bucket["tokens"] = min(self.burst, bucket["tokens"] + elapsed * self._refill_rate)
-            bucket["time"] = current
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(self.burst, current)
 
-            if bucket["tokens"] >= tokens:
-                bucket["tokens"] -= tokens
-                await incr("limiter.fast.accepted")
-                return True
+        if bucket.take(tokens, current, self.burst, self._refill_rate):
+            incr_nowait("limiter.fast.accepted")
+            return True, 0.0
 
-            await incr("limiter.fast.rejected")
-            return False
+        incr_nowait("limiter.fast.rejected")
+        return False, (tokens - bucket.tokens) * self._inv_refill
 
     async def release(self, key: str, tokens: float = 1) -> None:
         """Возвращает токены обратно (например, при отмене операции)."""
-        async with self._lock:
-            if key in self._buckets:
-                bucket = self._buckets[key]
-                bucket["tokens"] = min(self.burst, bucket["tokens"] + tokens)
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket.tokens = min(self.burst, bucket.tokens + tokens)
 
     async def get_stats(self, key: str) -> Dict[str, Any]:
         """Возвращает текущее состояние ведра."""
-        async with self._lock:
-            bucket = self._buckets.get(key, {"tokens": self.burst, "time": now()})
-            return {
-                "available_tokens": bucket["tokens"],
-                "max_tokens": self.burst,
-                "refill_rate": self._refill_rate
-            }
+        bucket = self._buckets.get(key)
+        return {
+            "available_tokens": bucket.tokens if bucket is not None else self.burst,
+            "max_tokens": self.burst,
+            "refill_rate": self._refill_rate
+        }
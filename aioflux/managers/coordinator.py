@@ -1,4 +1,5 @@
 import asyncio
+import random
 import uuid
 from typing import Optional
 
@@ -15,6 +16,47 @@ class Coordinator:
 
     Используется для синхронизации нескольких инстансов —
     например, чтобы только один выполнял периодические задачи
+
+    Lua скрипты - атрибуты класса: одна строка на все вызовы, SHA считается
+    один раз, и RedisStorage шлет их по EVALSHA, а не телом.
+    """
+
+    _acquire_script = """
+    local key = KEYS[1]
+    local instance = ARGV[1]
+    local ttl_ms = tonumber(ARGV[2])
+
+    local current = redis.call('GET', key)
+    if not current or current == instance then
+        redis.call('SET', key, instance, 'PX', ttl_ms)
+        return 1
+    end
+    return 0
+    """
+
+    _release_script = """
+    local key = KEYS[1]
+    local instance = ARGV[1]
+
+    local current = redis.call('GET', key)
+    if current == instance then
+        redis.call('DEL', key)
+        return 1
+    end
+    return 0
+    """
+
+    _heartbeat_script = """
+    local key = KEYS[1]
+    local instance = ARGV[1]
+    local ttl_ms = tonumber(ARGV[2])
+
+    local current = redis.call('GET', key)
+    if current == instance then
+        redis.call('PEXPIRE', key, ttl_ms)
+        return 1
+    end
+    return 0
     """
 
     def __init__(
@@ -34,6 +76,8 @@ class Coordinator:
         self.lock_name = lock_name
         self.ttl = ttl
         self.retry_interval = retry_interval
+        # TTL в мс: целые секунды обрезали бы ttl < 1 до нуля
+        self._ttl_ms = max(1, int(ttl * 1000))
         self._instance_id = str(uuid.uuid4())
         self._is_leader = False
         self._heartbeat_task: Optional[asyncio.Task] = None
@@ -43,23 +87,10 @@ class Coordinator:
         Пытаемся стать лидером.
         Если ключ в Redis свободен или уже принадлежит нам — устанавливаем его с ttl и становимся лидером
         """
-        script = """
-        local key = KEYS[1]
-        local instance = ARGV[1]
-        local ttl = tonumber(ARGV[2])
-
-        local current = redis.call('GET', key)
-        if not current or current == instance then
-            redis.call('SET', key, instance, 'EX', ttl)
-            return 1
-        end
-        return 0
-        """
-
         result = await self.storage.eval_script(
-            script,
+            self._acquire_script,
             [self.lock_name],
-            [self._instance_id, int(self.ttl)]
+            [self._instance_id, self._ttl_ms]
         )
 
         self._is_leader = result == 1
@@ -81,20 +112,8 @@ class Coordinator:
             self._heartbeat_task.cancel()
             self._heartbeat_task = None
 
-        script = """
-        local key = KEYS[1]
-        local instance = ARGV[1]
-
-        local current = redis.call('GET', key)
-        if current == instance then
-            redis.call('DEL', key)
-            return 1
-        end
-        return 0
-        """
-
         await self.storage.eval_script(
-            script,
+            self._release_script,
             [self.lock_name],
             [self._instance_id]
         )
@@ -109,25 +128,14 @@ class Coordinator:
         """
         while True:
             try:
-                await asyncio.sleep(self.ttl / 2)
-
-                script = """
-                local key = KEYS[1]
-                local instance = ARGV[1]
-                local ttl = tonumber(ARGV[2])
-
-                local current = redis.call('GET', key)
-                if current == instance then
-                    redis.call('EXPIRE', key, ttl)
-                    return 1
-                end
-                return 0
-                """
+                # продлеваем заранее (на 40-50% ttl), чтобы залипший loop не успел
+                # упустить блокировку; джиттер разводит инстансы по времени
+                await asyncio.sleep(self.ttl * 0.4 + random.random() * self.ttl * 0.1)
 
                 result = await self.storage.eval_script(
-                    script,
+                    self._heartbeat_script,
                     [self.lock_name],
-                    [self._instance_id, int(self.ttl)]
+                    [self._instance_id, self._ttl_ms]
                 )
 
                 if result != 1:
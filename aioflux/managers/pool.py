@@ -1,7 +1,12 @@
 import asyncio
-from typing import Any, Callable, List, Optional
+from functools import partial
+from typing import Any, Callable, List, Optional, Set
 
-from aioflux.core.metrics import gauge, incr
+from aioflux.core.metrics import gauge_nowait, incr_nowait
+
+
+# маркер остановки: воркер, достав его из очереди, завершается
+_STOP = object()
 
 
 class WorkerPool:
@@ -12,6 +17,12 @@ class WorkerPool:
     Количество воркеров регулируется автоматически:
     - увеличивается при росте нагрузки
     - уменьшается при простое
+
+    Корутины выполняются прямо в воркере. Синхронные функции - тоже
+    в потоке loop'а (могут трогать объекты, привязанные к loop), но пока
+    такая функция работает, весь loop стоит. sync_in_executor=True
+    отправляет их в дефолтный executor loop'а: loop не блокируется,
+    зато функция работает в другом потоке - трогать из нее asyncio-объекты нельзя.
     """
 
     def __init__(
@@ -20,7 +31,8 @@ class WorkerPool:
         max_workers: int = 10,
         scale_up_threshold: float = 0.8,
         scale_down_threshold: float = 0.2,
-        check_interval: float = 5.0
+        check_interval: float = 5.0,
+        sync_in_executor: bool = False
     ):
         """
         min_workers — минимальное число воркеров (держим всегда)
@@ -28,15 +40,19 @@ class WorkerPool:
         scale_up_threshold — при какой загрузке добавляем воркера
         scale_down_threshold — при какой уменьшаем
         check_interval — как часто проверяем нагрузку
+        sync_in_executor — выполнять синхронные функции в executor'е, а не в потоке loop'а
         """
         self.min_workers = min_workers
         self.max_workers = max_workers
         self.scale_up_threshold = scale_up_threshold
         self.scale_down_threshold = scale_down_threshold
         self.check_interval = check_interval
+        self.sync_in_executor = sync_in_executor
 
         self._queue = asyncio.Queue()
         self._workers: List[asyncio.Task] = []
+        # воркеры, которые сейчас ждут задачу - только их можно снять без потери работы
+        self._idle: Set[asyncio.Task] = set()
         self._running = False
         self._monitor_task: Optional[asyncio.Task] = None
 
@@ -47,9 +63,15 @@ class WorkerPool:
         self._monitor_task = asyncio.create_task(self._monitor())
 
     async def stop(self) -> None:
+        """
+        Остановить пул. Маркеры встают в очередь после уже отправленных задач,
+        так что воркеры сначала дорабатывают их, потом выходят.
+        """
         self._running = False
         if self._monitor_task:
             self._monitor_task.cancel()
+        for _ in self._workers:
+            self._queue.put_nowait(_STOP)
         await asyncio.gather(*self._workers, return_exceptions=True)
 
     async def submit(self, func: Callable, *args, **kwargs) -> Any:
@@ -58,45 +80,65 @@ class WorkerPool:
         func — любая функция (синхронная или асинхронная).
         Возвращает результат выполнения.
         """
-        future = asyncio.Future()
+        future = asyncio.get_running_loop().create_future()
         await self._queue.put((func, args, kwargs, future))
-        await incr("pool.submit")
+        incr_nowait("pool.submit")
         return await future
 
     async def _add_worker(self) -> None:
         worker = asyncio.create_task(self._worker())
         self._workers.append(worker)
-        await gauge("pool.workers", len(self._workers))
+        gauge_nowait("pool.workers", len(self._workers))
 
     async def _remove_worker(self) -> None:
-        if self._workers:
-            worker = self._workers.pop()
-            worker.cancel()
-            await gauge("pool.workers", len(self._workers))
+        """
+        Снимаем простаивающего воркера. Занятого не трогаем: cancel посреди
+        задачи оставил бы ее future без результата, и submit() завис бы навсегда.
+        """
+        for worker in reversed(self._workers):
+            if worker in self._idle:
+                self._workers.remove(worker)
+                worker.cancel()
+                gauge_nowait("pool.workers", len(self._workers))
+                return
 
     async def _worker(self) -> None:
         """
         Воркеры извлекают задачи из очереди и выполняют их.
-        При ошибках ставим исключение в future, чтобы вызывающий узнал
+        При ошибках ставим исключение в future, чтобы вызывающий узнал.
+
+        Ждем очередь без таймаута - простаивающий воркер не дергает таймер
+        каждую секунду. Выходим по маркеру из stop() или по cancel() при сжатии пула.
         """
-        while self._running:
+        me = asyncio.current_task()
+        while True:
+            self._idle.add(me)
             try:
-                func, args, kwargs, future = await asyncio.wait_for(
-                    self._queue.get(), timeout=1.0
-                )
-
-                try:
-                    if asyncio.iscoroutinefunction(func):
-                        result = await func(*args, **kwargs)
-                    else:
-                        result = func(*args, **kwargs)
+                task = await self._queue.get()
+            finally:
+                self._idle.discard(me)
+            if task is _STOP:
+                break
+            func, args, kwargs, future = task
+
+            try:
+                if asyncio.iscoroutinefunction(func):
+                    result = await func(*args, **kwargs)
+                elif self.sync_in_executor:
+                    # синхронный код в потоке - иначе встанет весь loop
+                    result = await asyncio.get_running_loop().run_in_executor(
+                        None, partial(func, *args, **kwargs)
+                    )
+                else:
+                    result = func(*args, **kwargs)
+                # вызывающий мог уже отменить ожидание
+                if not future.done():
                     future.set_result(result)
-                    await incr("pool.processed")
-                except Exception as e:
+                incr_nowait("pool.processed")
+            except Exception as e:
+                if not future.done():
                     future.set_exception(e)
-                    await incr("pool.errors")
-            except asyncio.TimeoutError:
-                continue
+                incr_nowait("pool.errors")
 
     async def _monitor(self) -> None:
         """
@@ -116,8 +158,8 @@ class WorkerPool:
 
             if load > self.scale_up_threshold and worker_count < self.max_workers:
                 await self._add_worker()
-                await incr("pool.scaled_up")
+                incr_nowait("pool.scaled_up")
 
             elif load < self.scale_down_threshold and worker_count > self.min_workers:
                 await self._remove_worker()
-                await incr("pool.scaled_down")
+                incr_nowait("pool.scaled_down")
@@ -1,10 +1,16 @@
-from typing import Callable, Dict, Optional, List
-from aioflux.utils.common import now
+from typing import Callable, Dict, Optional, List, Tuple
+from aioflux.utils.common import monotonic
 from aioflux.core.metrics import incr
+from itertools import count
 import asyncio
+import heapq
 from dataclasses import dataclass
 
 
+# чаще этого джобы не гоняем - иначе interval=0 крутил бы цикл без await
+_MIN_INTERVAL = 0.1
+
+
 @dataclass
 class Job:
     func: Callable
@@ -14,10 +20,22 @@ class Job:
 
 
 class Scheduler:
+    """
+    Планировщик периодических джобов.
+
+    Джобы лежат в куче по next_run: цикл спит ровно до ближайшего,
+    а не опрашивает все джобы каждые 100мс. Новый джоб будит цикл через
+    событие - вдруг он раньше текущего ближайшего.
+    """
+
     def __init__(self):
         self._jobs: Dict[str, Job] = {}
+        # (next_run, порядковый номер, job) - номер, чтобы не сравнивать Job при равном времени
+        self._heap: List[Tuple[float, int, Job]] = []
+        self._seq = count()
         self._running = False
         self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
     
     def every(
         self,
@@ -39,33 +57,66 @@ class Scheduler:
             job = Job(
                 func=func,
                 interval=interval,
-                next_run=now() + interval,
+                next_run=monotonic() + interval,
                 name=job_name
             )
             self._jobs[job_name] = job
+            self._push(job)
             return func
         
         return decorator
     
+    def _push(self, job: Job) -> None:
+        heapq.heappush(self._heap, (job.next_run, next(self._seq), job))
+        if self._wake is not None:
+            self._wake.set()
+
     async def start(self) -> None:
         self._running = True
+        self._wake = asyncio.Event()
+        # джобы, объявленные до старта, отсчитываем от общего момента старта
+        epoch = monotonic()
+        for job in self._jobs.values():
+            job.next_run = epoch + job.interval
+        self._heap.clear()
+        for job in self._jobs.values():
+            self._push(job)
         self._task = asyncio.create_task(self._run())
     
     async def stop(self) -> None:
         self._running = False
+        if self._wake is not None:
+            self._wake.set()
         if self._task:
             await self._task
     
     async def _run(self) -> None:
+        heap = self._heap
         while self._running:
-            current = now()
-            
-            for job in list(self._jobs.values()):
-                if current >= job.next_run:
-                    asyncio.create_task(self._execute_job(job))
-                    job.next_run = current + job.interval
-            
-            await asyncio.sleep(0.1)
+            delay = heap[0][0] - monotonic() if heap else None
+            if delay is None or delay > 0:
+                # спим до ближайшего джоба (или пока не добавят новый / не остановят)
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            next_run, _, job = heapq.heappop(heap)
+            if self._jobs.get(job.name) is not job or job.next_run != next_run:
+                # джоб перерегистрировали под тем же именем - запись устарела
+                continue
+
+            asyncio.create_task(self._execute_job(job))
+            # от плановой отметки, а не от "сейчас" - иначе опоздания копятся.
+            # Проспали несколько запусков (залип loop) - пропускаем их, а не гоним подряд
+            step = max(job.interval, _MIN_INTERVAL)
+            job.next_run = next_run + step
+            current = monotonic()
+            if job.next_run <= current:
+                job.next_run += ((current - job.next_run) // step + 1) * step
+            self._push(job)
     
     async def _execute_job(self, job: Job) -> None:
         try:
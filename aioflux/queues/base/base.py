@@ -1,5 +1,8 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Iterable, List
+
+from aioflux.utils.common import timeout
 
 
 class BaseQueue(ABC):
@@ -13,11 +16,39 @@ class BaseQueue(ABC):
         """Кладем задачу в очередь"""
         pass
 
+    async def put_many(self, items: Iterable[Any]) -> None:
+        """
+        Кладем пачку задач. По умолчанию - просто put на каждую,
+        очереди, которые умеют быстрее, переопределяют
+        """
+        for item in items:
+            await self.put(item)
+
     @abstractmethod
     async def get(self) -> Any:
         """Достаем задачу из очереди"""
         pass
 
+    async def get_many(self, max_items: int) -> List[Any]:
+        """
+        Забираем до max_items задач из тех, что уже готовы к выдаче.
+        Новых не ждем - пустая очередь дает [].
+
+        По умолчанию - get в цикле, каждый с нулевым таймаутом: size() тут
+        не годится (в DelayQueue он считает и задачи, чье время не пришло,
+        а другой потребитель может забрать задачу между size() и get()).
+        get() должен переживать отмену без потери задачи, как asyncio.Queue.
+        Очереди, которые умеют быстрее, переопределяют
+        """
+        items = []
+        while len(items) < max_items:
+            try:
+                async with timeout(0):
+                    items.append(await self.get())
+            except asyncio.TimeoutError:
+                break
+        return items
+
     @abstractmethod
     async def size(self) -> int:
         """Смотрим сколько задач в очереди"""
@@ -1,5 +1,5 @@
 from abc import abstractmethod
-from typing import Callable, Generic, Optional, Protocol, TypeVar
+from typing import Callable, Generic, Iterable, List, Optional, Protocol, TypeVar
 
 from aioflux.queues.dedupe import DedupeQueue
 from aioflux.queues.base.base import BaseQueue
@@ -30,13 +30,25 @@ class TypedDedupeQueue(TypedQueue[T], Generic[T]):
         key_fn: Optional[Callable[[T], str]] = None
     ):
         self._queue = DedupeQueue(workers, max_size, ttl, key_fn)
+        # методы ниже - просто проброс в DedupeQueue; вешаем на инстанс его методы
+        # напрямую, чтобы не платить за лишний кадр на каждый put/get.
+        # Переопределенные в наследнике методы не трогаем
+        for name in ("put", "put_many", "get", "get_many", "size", "start", "stop"):
+            if getattr(type(self), name) is getattr(TypedDedupeQueue, name):
+                setattr(self, name, getattr(self._queue, name))
 
     async def put(self, item: T, priority: int = 0) -> None:
         await self._queue.put(item, priority)
 
+    async def put_many(self, items: Iterable[T]) -> None:
+        await self._queue.put_many(items)
+
     async def get(self) -> T:
         return await self._queue.get()
 
+    async def get_many(self, max_items: int) -> List[T]:
+        return await self._queue.get_many(max_items)
+
     async def size(self) -> int:
         return await self._queue.size()
 
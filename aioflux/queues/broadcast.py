@@ -1,8 +1,8 @@
 import asyncio
-from typing import Any, List
+from typing import Any, Tuple
 
 from aioflux.queues.base.base import BaseQueue
-from aioflux.core.metrics import gauge, incr
+from aioflux.core.metrics import gauge_nowait, incr_nowait
 
 
 class BroadcastQueue(BaseQueue):
@@ -18,9 +18,10 @@ class BroadcastQueue(BaseQueue):
         max_size — максимальный размер очереди для каждого подписчика.
         """
         self.max_size = max_size
-        self._subscribers: List[asyncio.Queue] = []
+        # copy-on-write: подписка/отписка собирают новый кортеж, а put просто
+        # берет текущий. Нигде внутри нет await, поэтому и лок не нужен
+        self._subscribers: Tuple[asyncio.Queue, ...] = ()
         self._running = False
-        self._lock = asyncio.Lock()
 
     async def put(self, item: Any, priority: int = 0) -> None:
         """
@@ -28,15 +29,19 @@ class BroadcastQueue(BaseQueue):
 
         Если у подписчика очередь переполнена — событие для него теряется.
         """
-        async with self._lock:
-            for queue in self._subscribers:
-                try:
-                    queue.put_nowait(item)
-                except asyncio.QueueFull:
-                    await incr("queue.broadcast.dropped")
+        # full() проверяем заранее: на медленных подписчиках это частый случай,
+        # а поднимать и ловить QueueFull на каждого - дорого
+        dropped = 0
+        for queue in self._subscribers:
+            if queue.full():
+                dropped += 1
+            else:
+                queue.put_nowait(item)
+        if dropped:
+            incr_nowait("queue.broadcast.dropped", dropped)
 
-            await incr("queue.broadcast.put")
-            await gauge("queue.broadcast.subscribers", len(self._subscribers))
+        # гаудж подписчиков тут не трогаем - он меняется только в subscribe/unsubscribe
+        incr_nowait("queue.broadcast.put")
 
     async def get(self) -> Any:
         """
@@ -46,8 +51,7 @@ class BroadcastQueue(BaseQueue):
 
     async def size(self) -> int:
         """Возвращает количество активных подписчиков."""
-        async with self._lock:
-            return len(self._subscribers)
+        return len(self._subscribers)
 
     async def subscribe(self) -> asyncio.Queue:
         """
@@ -55,21 +59,19 @@ class BroadcastQueue(BaseQueue):
         Каждый элемент, отправленный через put(), попадёт в эту очередь.
         """
         queue = asyncio.Queue(maxsize=self.max_size)
-        async with self._lock:
-            self._subscribers.append(queue)
-            await incr("queue.broadcast.subscribed")
-            await gauge("queue.broadcast.subscribers", len(self._subscribers))
+        self._subscribers += (queue,)
+        incr_nowait("queue.broadcast.subscribed")
+        gauge_nowait("queue.broadcast.subscribers", len(self._subscribers))
         return queue
 
     async def unsubscribe(self, queue: asyncio.Queue) -> None:
         """
         Отписывает подписчика и удаляет его очередь.
         """
-        async with self._lock:
-            if queue in self._subscribers:
-                self._subscribers.remove(queue)
-                await incr("queue.broadcast.unsubscribed")
-                await gauge("queue.broadcast.subscribers", len(self._subscribers))
+        if queue in self._subscribers:
+            self._subscribers = tuple(q for q in self._subscribers if q is not queue)
+            incr_nowait("queue.broadcast.unsubscribed")
+            gauge_nowait("queue.broadcast.subscribers", len(self._subscribers))
 
     async def start(self) -> None:
         self._running = True
@@ -80,10 +82,9 @@ class BroadcastQueue(BaseQueue):
         Очищает очереди всех подписчиков.
         """
         self._running = False
-        async with self._lock:
-            for queue in self._subscribers:
-                while not queue.empty():
-                    try:
-                        queue.get_nowait()
-                    except asyncio.QueueEmpty:
-                        break
+        for queue in self._subscribers:
+            while not queue.empty():
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
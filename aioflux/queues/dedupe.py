@@ -1,6 +1,6 @@
 from aioflux.queues.base.base import BaseQueue
-from aioflux.core.metrics import incr, gauge
-from typing import Any, Optional, Callable, Set
+from aioflux.core.metrics import incr, incr_nowait, gauge, gauge_nowait
+from typing import Any, Optional, Callable, Iterable, List, Set
 import asyncio
 import hashlib
 
@@ -14,8 +14,14 @@ class DedupeQueue(BaseQueue):
 
     Полезна для задач, где одно и то же действие может быть запрошено
     многократно, но выполнять его нужно лишь раз (например, индексация или уведомления).
+
+    Протухание ключей - кольцо из корзин по ttl/_BUCKETS секунд: новый ключ
+    кладется в текущую корзину, раз в тик самая старая корзина выкидывается
+    из `_seen` целиком. Один таймер на очередь вместо таски на каждый ключ.
     """
 
+    _BUCKETS = 60
+
     def __init__(
         self,
         workers: int = 1,
@@ -36,6 +42,11 @@ class DedupeQueue(BaseQueue):
 
         self._queue = asyncio.Queue(maxsize=max_size)
         self._seen: Set[str] = set()
+        self._tick = ttl / self._BUCKETS
+        # +1 корзина, чтобы ключ жил не меньше ttl
+        self._buckets: List[Set[str]] = [set() for _ in range(self._BUCKETS + 1)]
+        self._idx = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
         self._tasks = []
         self._running = False
         self._lock = asyncio.Lock()
@@ -56,12 +67,36 @@ class DedupeQueue(BaseQueue):
                 await incr("queue.dedupe.duplicates")
                 return
 
-            self._seen.add(key)
+            self._remember(key)
             await self._queue.put((key, item))
             await incr("queue.dedupe.put")
             await gauge("queue.dedupe.size", self._queue.qsize())
 
-            asyncio.create_task(self._expire_key(key))
+    async def put_many(self, items: Iterable[Any]) -> None:
+        """
+        Пачка за один захват лока; дубли (в том числе внутри самой пачки)
+        отбрасываются так же, как в put
+        """
+        added = duplicates = 0
+        async with self._lock:
+            queue = self._queue
+            for item in items:
+                key = self.key_fn(item)
+                if key in self._seen:
+                    duplicates += 1
+                    continue
+
+                self._remember(key)
+                if queue.full():
+                    await queue.put((key, item))
+                else:
+                    queue.put_nowait((key, item))
+                added += 1
+
+        if duplicates:
+            incr_nowait("queue.dedupe.duplicates", duplicates)
+        incr_nowait("queue.dedupe.put", added)
+        gauge_nowait("queue.dedupe.size", self._queue.qsize())
 
     async def get(self) -> Any:
         key, item = await self._queue.get()
@@ -69,6 +104,17 @@ class DedupeQueue(BaseQueue):
         await gauge("queue.dedupe.size", self._queue.qsize())
         return item
 
+    async def get_many(self, max_items: int) -> List[Any]:
+        """Забираем то, что уже лежит (до max_items), через get_nowait"""
+        queue = self._queue
+        items = []
+        while len(items) < max_items and not queue.empty():
+            items.append(queue.get_nowait()[1])
+        if items:
+            incr_nowait("queue.dedupe.get", len(items))
+            gauge_nowait("queue.dedupe.size", queue.qsize())
+        return items
+
     async def size(self) -> int:
         return self._queue.qsize()
 
@@ -109,11 +155,29 @@ class DedupeQueue(BaseQueue):
             except Exception:
                 await incr(f"queue.dedupe.worker.{worker_id}.errors")
 
-    async def _expire_key(self, key: str) -> None:
+    def _remember(self, key: str) -> None:
         """
-        Удаляет ключ из `_seen` по истечении TTL,
-        чтобы элементы могли снова попасть в очередь.
+        Запоминает ключ в текущей корзине и заводит таймер ротации, если он стоит.
         """
-        await asyncio.sleep(self.ttl)
-        async with self._lock:
-            self._seen.discard(key)
+        self._seen.add(key)
+        self._buckets[self._idx].add(key)
+        if self._timer is None:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(self._tick, self._rotate)
+
+    def _rotate(self) -> None:
+        """
+        Тик кольца: самая старая корзина (ей уже не меньше ttl) уходит из `_seen`
+        и становится текущей. Когда помнить нечего - таймер засыпает до следующего put.
+        """
+        self._idx = (self._idx + 1) % len(self._buckets)
+        oldest = self._buckets[self._idx]
+        if oldest:
+            self._seen.difference_update(oldest)
+            oldest.clear()
+
+        if self._seen:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(self._tick, self._rotate)
+        else:
+            self._timer = None
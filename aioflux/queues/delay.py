@@ -1,11 +1,11 @@
 import asyncio
 from dataclasses import dataclass, field
 from heapq import heappop, heappush
-from typing import Any
+from typing import Any, List
 
-from aioflux.utils.common import now
+from aioflux.utils.common import monotonic
 from aioflux.queues.base.base import BaseQueue
-from aioflux.core.metrics import gauge, incr
+from aioflux.core.metrics import gauge, gauge_nowait, incr, incr_nowait
 
 
 @dataclass(order=True)
@@ -48,7 +48,7 @@ class DelayQueue(BaseQueue):
             if len(self._queue) >= self.max_size:
                 raise asyncio.QueueFull()
 
-            execute_at = now() + delay
+            execute_at = monotonic() + delay
             heappush(self._queue, DelayedItem(execute_at, item))
             await incr("queue.delay.put")
             await gauge("queue.delay.size", len(self._queue))
@@ -67,7 +67,7 @@ class DelayQueue(BaseQueue):
                     continue
 
                 item = self._queue[0]
-                current = now()
+                current = monotonic()
 
                 if item.execute_at <= current:
                     heappop(self._queue)
@@ -81,6 +81,22 @@ class DelayQueue(BaseQueue):
                 except asyncio.TimeoutError:
                     continue
 
+    async def get_many(self, max_items: int) -> List[Any]:
+        """
+        Забираем до max_items задач, чье время уже пришло.
+        Не дождавшиеся остаются в очереди, новых не ждем.
+        """
+        async with self._lock:
+            queue = self._queue
+            current = monotonic()
+            items = []
+            while queue and len(items) < max_items and queue[0].execute_at <= current:
+                items.append(heappop(queue).item)
+            if items:
+                incr_nowait("queue.delay.get", len(items))
+                gauge_nowait("queue.delay.size", len(queue))
+            return items
+
     async def size(self) -> int:
         async with self._lock:
             return len(self._queue)
@@ -1,6 +1,6 @@
 from aioflux.queues.base.base import BaseQueue
-from aioflux.core.metrics import incr, gauge, Timer
-from typing import Any, Optional, Callable, List
+from aioflux.core.metrics import incr, incr_nowait, gauge, gauge_nowait, Timer
+from typing import Any, Optional, Callable, Iterable, List
 import asyncio
 
 
@@ -45,12 +45,51 @@ class FIFOQueue(BaseQueue):
         await incr("queue.fifo.put")
         await gauge("queue.fifo.size", self._queue.qsize())
 
+    def put_nowait(self, item: Any) -> None:
+        """
+        Синхронный put для горячего пути продюсера - без await и переключений.
+        Если очередь забита - asyncio.QueueFull, решать вызывающему.
+        """
+        self._queue.put_nowait(item)
+        incr_nowait("queue.fifo.put")
+        gauge_nowait("queue.fifo.size", self._queue.qsize())
+
+    async def put_many(self, items: Iterable[Any]) -> None:
+        """
+        Кладем пачку: пока есть место - put_nowait без await,
+        метрики - один раз на всю пачку, а не на каждый элемент
+        """
+        queue = self._queue
+        n = 0
+        for item in items:
+            if queue.full():
+                await queue.put(item)
+            else:
+                queue.put_nowait(item)
+            n += 1
+        incr_nowait("queue.fifo.put", n)
+        gauge_nowait("queue.fifo.size", queue.qsize())
+
     async def get(self) -> Any:
         item = await self._queue.get()
         await incr("queue.fifo.get")
         await gauge("queue.fifo.size", self._queue.qsize())
         return item
 
+    async def get_many(self, max_items: int) -> List[Any]:
+        """
+        Забираем то, что уже лежит (до max_items), через get_nowait -
+        без await на каждый элемент, метрики - один раз на пачку
+        """
+        queue = self._queue
+        items = []
+        while len(items) < max_items and not queue.empty():
+            items.append(queue.get_nowait())
+        if items:
+            incr_nowait("queue.fifo.get", len(items))
+            gauge_nowait("queue.fifo.size", queue.qsize())
+        return items
+
     async def size(self) -> int:
         return self._queue.qsize()
 
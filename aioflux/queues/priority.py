@@ -2,10 +2,10 @@ import asyncio
 from dataclasses import dataclass, field
 from heapq import heappop, heappush
 from time import time
-from typing import Any, Callable, Optional
+from typing import Any, Callable, List, Optional
 
 from aioflux.queues.base.base import BaseQueue
-from aioflux.core.metrics import gauge, incr, Timer
+from aioflux.core.metrics import gauge, gauge_nowait, incr, incr_nowait, Timer
 
 
 @dataclass(order=True)
@@ -84,6 +84,20 @@ class PriorityQueue(BaseQueue):
             await gauge("queue.priority.size", len(self._queue))
             return item.item
 
+    async def get_many(self, max_items: int) -> List[Any]:
+        """
+        Забираем до max_items задач с наивысшим приоритетом из тех, что есть.
+        Новых не ждем - пустая очередь дает [].
+        """
+        async with self._lock:
+            queue = self._queue
+            items = [heappop(queue).item for _ in range(min(max_items, len(queue)))]
+            if items:
+                self._not_full.notify(len(items))
+                incr_nowait("queue.priority.get", len(items))
+                gauge_nowait("queue.priority.size", len(queue))
+            return items
+
     async def size(self) -> int:
         async with self._lock:
             return len(self._queue)
@@ -1,4 +1,5 @@
-from typing import List, Callable, Any, TypeVar, Optional
+from itertools import islice
+from typing import List, Callable, Any, Iterable, Tuple, TypeVar, Optional
 import asyncio
 
 
@@ -64,6 +65,40 @@ async def batch_gather(
     return results
 
 
+async def batch_gather_pairs(
+    pairs: Iterable[Tuple[Callable, Any]],
+    batch_size: int = 10
+) -> List[Any]:
+    """
+    То же, что batch_gather, но вызовы заданы парами (функция, аргумент) -
+    без partial на каждый вызов. pairs может быть генератором:
+    читаем его по batch_size, целиком в память не собираем.
+
+    Пример:
+        pairs = ((fetch, i) for i in range(1000))
+        results = await batch_gather_pairs(pairs, batch_size=20)
+    """
+    results = []
+    # iscoroutinefunction - один раз на функцию, а не на каждый вызов
+    is_async = {}
+    it = iter(pairs)
+
+    while True:
+        batch = list(islice(it, batch_size))
+        if not batch:
+            break
+
+        calls = []
+        for fn, arg in batch:
+            async_fn = is_async.get(fn)
+            if async_fn is None:
+                async_fn = is_async[fn] = asyncio.iscoroutinefunction(fn)
+            calls.append(fn(arg) if async_fn else asyncio.to_thread(fn, arg))
+        results.extend(await asyncio.gather(*calls))
+
+    return results
+
+
 class BatchCollector:
     """
     Асинхронный сборщик событий в пачки (batch collector).
@@ -95,6 +130,11 @@ class BatchCollector:
         self._last_flush = asyncio.get_event_loop().time()
         self._flush_task: Optional[asyncio.Task] = None
 
+    @property
+    def pending(self) -> int:
+        """Сколько элементов ждут отправки"""
+        return len(self._items)
+
     async def add(self, item: Any) -> None:
         """
         Добавляет элемент в буфер.
@@ -108,13 +148,30 @@ class BatchCollector:
             elif not self._flush_task:
                 self._flush_task = asyncio.create_task(self._auto_flush())
 
-    async def _flush(self) -> None:
-        """Выгружает накопленные элементы и вызывает callback."""
+    async def add_many(self, items: List[Any]) -> None:
+        """
+        Добавляет пачку элементов за один заход под лок.
+        Полные батчи (по batch_size) сразу уходят в callback, остаток ждет.
+        """
+        if not items:
+            return
+
+        async with self._lock:
+            self._items.extend(items)
+
+            while len(self._items) >= self.batch_size:
+                await self._flush(self.batch_size)
+
+            if self._items and not self._flush_task:
+                self._flush_task = asyncio.create_task(self._auto_flush())
+
+    async def _flush(self, limit: Optional[int] = None) -> None:
+        """Выгружает накопленные элементы (не больше limit) и вызывает callback."""
         if not self._items:
             return
 
-        items = self._items[:]
-        self._items.clear()
+        items = self._items[:limit]
+        del self._items[:limit]
         self._last_flush = asyncio.get_event_loop().time()
 
         if self.callback:
@@ -1,6 +1,93 @@
+import asyncio
+from time import monotonic as _monotonic
 from time import time
+from typing import Callable, Optional
+
+try:
+    from asyncio import timeout
+except ImportError:  # python < 3.11
+    from async_timeout import timeout
 
 
 def now() -> float:
-    """Текущее время в секундах - просто обертка над time()"""
+    """
+    Текущее время в секундах - просто обертка над time().
+    Wall clock: годится для состояния, которое лежит в общем Storage (Redis)
+    и сравнивается между процессами/машинами.
+    """
     return time()
+
+
+# Монотонные часы - для замеров "сколько прошло" внутри одного процесса.
+# Не прыгают от NTP и на Linux читаются через vDSO без системного вызова,
+# но между процессами несравнимы, поэтому в общий Storage их не пишем.
+monotonic = _monotonic
+
+# `timeout` - контекстный таймаут (asyncio.timeout или async_timeout на старых питонах).
+# В отличие от asyncio.wait_for не создает отдельный Task на каждое ожидание:
+#     async with timeout(1.0):
+#         item = await queue.get()
+
+
+async def run_task(func: Callable, args: tuple, kwargs: dict, fut: asyncio.Future) -> None:
+    """
+    Выполняем задачу из очереди и отдаем результат в future вызывающего.
+    Общий кусок для декораторов, которые ставят вызов в очередь и ждут
+    результат (queued, guarded):
+        fut = loop.create_future()
+        await queue.put(partial(run_task, func, args, kwargs, fut))
+        return await fut
+    """
+    try:
+        result = await func(*args, **kwargs)
+    except Exception as e:
+        if not fut.done():
+            fut.set_exception(e)
+    else:
+        # вызывающий мог уже отменить ожидание
+        if not fut.done():
+            fut.set_result(result)
+
+
+class SweepTimer:
+    """
+    Отложенный вызов фоновой чистки (протухшие ключи, старые окна и т.п.).
+
+    - Один таймер на владельца: schedule() с более поздним сроком, чем уже
+      запланированный, ничего не делает, с более ранним - переставляет таймер.
+    - Нет запущенного loop'а (синхронный вызов вне asyncio) - ничего не ставим,
+      таймер взведется при следующем schedule() изнутри loop'а.
+    - Таймер, оставшийся от другого (например закрытого после asyncio.run) loop'а,
+      не считается - ставим новый в текущем.
+
+    Пример:
+        self._sweeper = SweepTimer(self._sweep)
+        self._sweeper.schedule(monotonic() + 10)
+    """
+
+    __slots__ = ("_callback", "_handle", "_loop", "_at")
+
+    def __init__(self, callback: Callable[[], None]):
+        self._callback = callback
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._at = 0.0
+
+    def schedule(self, at: float) -> None:
+        """Вызвать callback не позже момента `at` (по monotonic())"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._handle is not None:
+            if self._loop is loop and self._at <= at:
+                return
+            self._handle.cancel()
+        self._loop = loop
+        self._at = at
+        self._handle = loop.call_later(max(at - monotonic(), 0.0), self._fire)
+
+    def _fire(self) -> None:
+        self._handle = None
+        self._loop = None
+        self._callback()
@@ -1,5 +1,5 @@
 from typing import Dict, Any
-from aioflux.core.metrics import get_stats
+from aioflux.core.metrics import get_stats, get_version
 import asyncio
 
 
@@ -9,6 +9,8 @@ class Monitor:
 
     Периодически опрашивает глобальные метрики (`get_stats()`)
     и передаёт их в метод `_report`, который реализуют наследники.
+    Если с прошлого раза в метрики ничего не писали - тик пропускается
+    без сборки статистики и без вывода.
     """
 
     def __init__(self, check_interval: float = 10.0):
@@ -32,9 +34,13 @@ class Monitor:
         """
         Основной цикл — периодически собирает и передаёт метрики.
         """
+        last_version = None
         while self._running:
-            stats = await get_stats()
-            await self._report(stats)
+            version = get_version()
+            if version != last_version:
+                last_version = version
+                stats = await get_stats()
+                await self._report(stats)
             await asyncio.sleep(self.check_interval)
 
     async def _report(self, stats: Dict[str, Any]) -> None:
@@ -4,6 +4,7 @@
 """
 
 import asyncio
+from functools import partial
 from aioflux import QueueFactory, queued
 
 
@@ -25,10 +26,10 @@ async def example_1_priority_queue():
         await asyncio.sleep(0.2)
     
     # Кидаем задачи в случайном порядке
-    await queue.put(lambda: task("низкий-1", 1), priority=1)
-    await queue.put(lambda: task("ВЫСОКИЙ", 10), priority=10)
-    await queue.put(lambda: task("средний", 5), priority=5)
-    await queue.put(lambda: task("низкий-2", 1), priority=1)
+    await queue.put(partial(task, "низкий-1", 1), priority=1)
+    await queue.put(partial(task, "ВЫСОКИЙ", 10), priority=10)
+    await queue.put(partial(task, "средний", 5), priority=5)
+    await queue.put(partial(task, "низкий-2", 1), priority=1)
     
     # Ждем выполнения
     await asyncio.sleep(1)
@@ -91,9 +92,9 @@ async def example_3_delayed_queue():
     print(f"Текущее время: {current_time:.1f}")
     
     # Планируем задачи с разной задержкой
-    await queue.put(lambda: task("через 0.5сек"), delay=0.5)
-    await queue.put(lambda: task("через 1.5сек"), delay=1.5)
-    await queue.put(lambda: task("через 1.0сек"), delay=1.0)
+    await queue.put(partial(task, "через 0.5сек"), delay=0.5)
+    await queue.put(partial(task, "через 1.5сек"), delay=1.5)
+    await queue.put(partial(task, "через 1.0сек"), delay=1.0)
     
     # Ждем выполнения всех
     await asyncio.sleep(2)
@@ -124,7 +125,9 @@ async def example_4_dedupe():
     # Кидаем одни и те же задачи несколько раз
     print("Кидаем задачи (с дубликатами):")
     for item_id in [1, 2, 1, 3, 2, 1, 4]:
-        await queue.put(lambda i=item_id: task(i))
+        # partial, а не lambda: одинаковые задачи дают одинаковый str(),
+        # у каждой новой lambda он свой, и дубли бы не отсеялись
+        await queue.put(partial(task, item_id))
         print(f"  Добавили task для item_{item_id}")
     
     await asyncio.sleep(1)
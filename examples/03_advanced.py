@@ -4,8 +4,8 @@
 
 import asyncio
 from aioflux import (
-    LimiterFactory, QueueFactory, rate_limit, queued,
-    circuit_breaker, CircuitBreakerOpen,
+    LimiterFactory, QueueFactory,
+    circuit_breaker, CircuitBreaker, CircuitBreakerOpen, guarded,
     get_stats, ConsoleMonitor
 )
 
@@ -18,10 +18,10 @@ async def example_1_composite_limiter():
     print("\n=== Пример 1: Составной лимитер ===\n")
     
     # 10 rpm И 50 rph
-    limiter = LimiterFactory.composite(
+    limiter = LimiterFactory.composite([
         LimiterFactory.token_bucket(rate=10, per=60),
         LimiterFactory.token_bucket(rate=50, per=3600)
-    )
+    ])
     
     # Проверяем оба лимита
     accepted = 0
@@ -80,10 +80,12 @@ async def example_3_full_stack():
     queue = QueueFactory.priority(workers=2)
     await queue.start()
     
-    # Функция с тремя декораторами
-    @rate_limit(limiter=limiter)
-    @queued(queue=queue, priority=10)
-    @circuit_breaker(failure_threshold=3)
+    breaker = CircuitBreaker(failure_threshold=3)
+    
+    # Лимит + очередь + предохранитель одной оберткой.
+    # То же, что @rate_limit(limiter=limiter) @queued(queue=queue, priority=10)
+    # @circuit_breaker(failure_threshold=3), но без трех вложенных вызовов
+    @guarded(limiter=limiter, queue=queue, breaker=breaker, priority=10)
     async def process_request(request_id: int):
         print(f"Обрабатываем запрос {request_id}")
         await asyncio.sleep(0.2)
@@ -150,9 +152,10 @@ async def example_5_monitoring():
     
     # Делаем какую-то работу
     limiter = LimiterFactory.token_bucket(rate=10, per=1.0)
+    users = [f"user_{i}" for i in range(3)]
     
     for i in range(50):
-        await limiter.acquire(f"user_{i % 3}")
+        await limiter.acquire(users[i % 3])
         await asyncio.sleep(0.05)
     
     # Даем мониторингу показать метрики
@@ -4,11 +4,16 @@
 """
 
 import asyncio
-from aioflux import LimiterFactory
+from aioflux import LimiterFactory, TokenBucketLimiter
 from aioflux.core.storage.redis_ import RedisStorage
 from aioflux.core.storage.hybrid import HybridStorage
 
 
+# Одно хранилище (и один пул соединений) на все примеры:
+# клиент создается лениво на первом запросе, дальше соединения переиспользуются
+STORAGE = RedisStorage("redis://localhost:6379")
+
+
 async def example_1_redis_limiter():
     """
     Пример 1: Распределенный лимитер через Redis.
@@ -16,19 +21,11 @@ async def example_1_redis_limiter():
     """
     print("\n=== Пример 1: Redis лимитер ===\n")
     
-    # Создаем Redis хранилище
-    try:
-        from redis.asyncio import Redis
-        redis = Redis.from_url("redis://localhost:6379")
-    except ImportError:
-        ...
-    storage = RedisStorage("redis://localhost:6379")
-    
     # Лимитер на 100 запросов в минуту - ОБЩИЙ для всех инстансов
     limiter = LimiterFactory.token_bucket(
         rate=100,
         per=60,
-        storage=storage,
+        storage=STORAGE,
         scope="global"  # Общая область
     )
     
@@ -52,13 +49,11 @@ async def example_2_per_user_redis():
     """
     print("\n=== Пример 2: Лимиты на пользователя (Redis) ===\n")
     
-    storage = RedisStorage("redis://localhost:6379")
-    
     # Каждый пользователь имеет свой лимит
     limiter = LimiterFactory.token_bucket(
         rate=10,
         per=60,
-        storage=storage,
+        storage=STORAGE,
         scope="user_limit"
     )
     
@@ -113,13 +108,11 @@ async def example_4_distributed_system():
     """
     print("\n=== Пример 4: Распределенная система ===\n")
     
-    storage = RedisStorage("redis://localhost:6379")
-    
     # Глобальный лимит на API - 1000 запросов в секунду
     global_limiter = LimiterFactory.token_bucket(
         rate=1000,
         per=1.0,
-        storage=storage,
+        storage=STORAGE,
         scope="api_global"
     )
     
@@ -127,7 +120,7 @@ async def example_4_distributed_system():
     user_limiter = LimiterFactory.token_bucket(
         rate=10,
         per=1.0,
-        storage=storage,
+        storage=STORAGE,
         scope="api_user"
     )
     
@@ -135,20 +128,24 @@ async def example_4_distributed_system():
     endpoint_limiter = LimiterFactory.token_bucket(
         rate=100,
         per=1.0,
-        storage=storage,
+        storage=STORAGE,
         scope="api_endpoint"
     )
     
     async def handle_request(user_id: str, endpoint: str):
         """Обработка запроса с тремя уровнями проверок"""
-        # Проверяем все три лимита
-        if not await global_limiter.acquire("api"):
+        # Все три лимита одним Lua скриптом: один поход в Redis,
+        # и если отказал user - global и endpoint токены не теряют
+        failed = await TokenBucketLimiter.acquire_all([
+            (global_limiter, "api"),
+            (endpoint_limiter, endpoint),
+            (user_limiter, user_id),
+        ])
+        if failed == 0:
             return "Global limit exceeded"
-        
-        if not await endpoint_limiter.acquire(endpoint):
+        if failed == 1:
             return f"Endpoint {endpoint} limit exceeded"
-        
-        if not await user_limiter.acquire(user_id):
+        if failed == 2:
             return f"User {user_id} limit exceeded"
         
         return "OK"
@@ -171,12 +168,11 @@ async def example_5_stats_monitoring():
     """
     print("\n=== Пример 5: Мониторинг ===\n")
     
-    storage = RedisStorage("redis://localhost:6379")
     limiter = LimiterFactory.token_bucket(
         rate=50,
         per=1.0,
         burst=75,
-        storage=storage
+        storage=STORAGE
     )
     
     # Делаем несколько запросов
@@ -4,7 +4,8 @@
 """
 
 import asyncio
-from aioflux import LimiterFactory, QueueFactory, rate_limit, queued, circuit_breaker
+from functools import partial
+from aioflux import LimiterFactory, QueueFactory, circuit_breaker, CircuitBreaker, guarded
 
 
 # Сценарий 1: API Gateway
@@ -82,12 +83,19 @@ class JobProcessor:
         if critical:
             # Критичные письма (восстановление пароля) - в приоритетную очередь
             await self.critical_queue.put(
-                lambda: self.send_email(email_data),
+                partial(self.send_email, email_data),
                 priority=10
             )
         else:
-            # Обычные письма - в батчинг
-            await self.bulk_queue.put(email_data)
+            # Обычные письма - в батчинг, без await: место есть почти всегда
+            try:
+                self.bulk_queue.put_nowait(email_data)
+            except asyncio.QueueFull:
+                await self.bulk_queue.put(email_data)
+
+    async def submit_emails(self, emails: list):
+        """Пачка обычных писем - в очередь одним вызовом, а не put на каждое"""
+        await self.bulk_queue.put_many(emails)
     
     async def send_email(self, email_data: dict):
         """Отправка одного письма"""
@@ -108,11 +116,12 @@ class ExternalAPIClient:
     """Клиент для внешнего API с лимитами"""
     
     def __init__(self):
-        # API имеет лимиты: 100 запросов в минуту и 1000 в час
-        self.limiter = LimiterFactory.composite(
-            LimiterFactory.token_bucket(rate=100, per=60, burst=120),
-            LimiterFactory.token_bucket(rate=1000, per=3600)
-        )
+        # API имеет лимиты: 100 запросов в минуту и 1000 в час.
+        # Оба в одном GCRA: одна проверка, при отказе нечего откатывать
+        self.limiter = LimiterFactory.gcra_multi([
+            (100, 60, 120),
+            (1000, 3600, None)
+        ])
         
         # Очередь с дедупликацией - не дублируем запросы
         self.request_queue = QueueFactory.dedupe(workers=5, ttl=60.0)
@@ -120,8 +129,10 @@ class ExternalAPIClient:
     async def start(self):
         await self.request_queue.start()
     
-    @rate_limit(rate=100, per=60)
-    @circuit_breaker(failure_threshold=5, timeout=60)
+    @guarded(
+        limiter=LimiterFactory.token_bucket(rate=100, per=60),
+        breaker=CircuitBreaker(failure_threshold=5, timeout=60)
+    )
     async def fetch_user(self, user_id: int):
         """Получение данных пользователя"""
         print(f"Запрашиваем пользователя {user_id}")
@@ -129,8 +140,11 @@ class ExternalAPIClient:
         return {"id": user_id, "name": f"User_{user_id}"}
     
     async def fetch_user_cached(self, user_id: int):
-        """Запрос с дедупликацией - одинаковые запросы не дублируются"""
-        await self.request_queue.put(lambda: self.fetch_user(user_id))
+        """
+        Запрос с дедупликацией - одинаковые запросы не дублируются.
+        partial, а не lambda: у partial стабильный repr, по нему считается ключ
+        """
+        await self.request_queue.put(partial(self.fetch_user, user_id))
 
 
 # Сценарий 4: Data Pipeline
@@ -161,19 +175,20 @@ class DataPipeline:
     
     async def process_record(self, record: dict):
         """Обработка одной записи"""
-        # Проверяем лимит на БД
-        if not await self.db_limiter.acquire("database"):
-            # Если БД перегружена - ждем
-            await asyncio.sleep(0.1)
-            return await self.process_record(record)
+        # Проверяем лимит на БД. Если БД перегружена - ждем ровно до появления
+        # токена (лимитер сам считает сколько), циклом, а не рекурсией
+        acquired, retry_after = await self.db_limiter.acquire_wait("database")
+        while not acquired:
+            await asyncio.sleep(retry_after)
+            acquired, retry_after = await self.db_limiter.acquire_wait("database")
         
         try:
             # Кладем в очередь на вставку
             await self.insert_queue.put(record)
-            await self.db_limiter.report_success()
+            self.db_limiter.report_success_nowait()
         except Exception as e:
             # При ошибке лимитер сам снизит rate
-            await self.db_limiter.report_error()
+            self.db_limiter.report_error_nowait()
             raise
     
     async def bulk_insert(self, records: list):
@@ -191,14 +206,19 @@ async def demo_api_gateway():
     
     gateway = APIGateway()
     
-    # Имитируем запросы от разных пользователей
-    for i in range(15):
-        user = f"user_{i % 3}"  # 3 пользователя
-        ip = f"192.168.1.{i % 5}"  # 5 IP адресов
-        
-        response, status = await gateway.handle_request(user, ip, "/api/data")
+    # Имитируем запросы от разных пользователей - приходят одновременно,
+    # как в живом gateway: пока один ждет backend, остальные уже проверяются
+    # ключи собираем один раз - одни и те же строки, а не новая f-строка на запрос
+    users = [f"user_{i}" for i in range(3)]  # 3 пользователя
+    ips = [f"192.168.1.{i}" for i in range(5)]  # 5 IP адресов
+    requests = [(users[i % 3], ips[i % 5]) for i in range(15)]
+    results = await asyncio.gather(*[
+        gateway.handle_request(user, ip, "/api/data")
+        for user, ip in requests
+    ])
+    
+    for i, ((user, ip), (response, status)) in enumerate(zip(requests, results)):
         print(f"Request {i+1} from {user} ({ip}): {status}")
-        await asyncio.sleep(0.05)
 
 
 async def demo_job_processor():
@@ -215,11 +235,10 @@ async def demo_job_processor():
     }, critical=True)
     
     # Отправляем пачку обычных писем
-    for i in range(250):
-        await processor.submit_email({
-            "to": f"user{i}@example.com",
-            "subject": "Newsletter"
-        })
+    await processor.submit_emails([
+        {"to": f"user{i}@example.com", "subject": "Newsletter"}
+        for i in range(250)
+    ])
     
     await asyncio.sleep(3)
     await processor.stop()
@@ -10,11 +10,13 @@ setup(
     install_requires=[
         "redis>=5.3.1",
         "aiohttp>=3.8.0",
+        'async-timeout>=4.0; python_version < "3.11"',
     ],
     extras_require={
         "dev": [
             "pytest>=7.0.0",
             "pytest-asyncio>=0.20.0",
+            "fakeredis[lua]>=2.20.0",
             "black>=22.0.0",
         ]
     },
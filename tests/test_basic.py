@@ -1,8 +1,19 @@
 import asyncio
 import sys
+import threading
+import time
+from functools import partial
 sys.path.insert(0, '/home/claude')
 
-from aioflux import LimiterFactory, QueueFactory, rate_limit, queued
+from aioflux import (
+    BatchFlux, CircuitBreaker, CircuitBreakerOpen, FluxConfig, GCRALimiter, LeakyBucketLimiter, LimiterFactory,
+    MemoryStorage, QueueFactory, RedisSlidingWindow, RedisStorage, Scheduler, SlidingWindowLimiter,
+    TokenBucketLimiter, WorkerPool, get_stats, guarded, rate_limit, queued, queued_sync
+)
+from aioflux.decorators.queue import _background_loop
+from aioflux.limiters.sliding_window import _Counter
+from aioflux.queues.base.base import BaseQueue
+from aioflux.utils.common import monotonic, timeout as _timeout
 
 
 async def test_token_bucket():
@@ -23,6 +34,202 @@ async def test_token_bucket():
     print("✓ Token Bucket test passed\n")
 
 
+async def test_token_bucket_local_batch():
+    print("Testing TokenBucket local_batch reservations...")
+
+    # резерв по 4 токена не должен выдать больше, чем есть в бакете
+    limiter = TokenBucketLimiter(rate=10, per=60, local_batch=4)
+    results = [await limiter.acquire("k") for _ in range(12)]
+    assert results.count(True) == 10, "Reservations should not over-grant"
+
+    # неистраченный резерв возвращается в storage
+    limiter = TokenBucketLimiter(rate=10, per=60, local_batch=4)
+    assert await limiter.acquire("k")
+    assert (await limiter.get_stats("k"))["available_tokens"] < 7
+    await limiter.release_reserved()
+    available = (await limiter.get_stats("k"))["available_tokens"]
+    assert available >= 9, "Unused reserved tokens should be returned"
+
+    # протухший резерв из словаря выкидывается
+    limiter = TokenBucketLimiter(rate=10, per=0.05, local_batch=4)
+    assert await limiter.acquire("k")
+    await asyncio.sleep(0.2)
+    assert not limiter._reserved, "Expired reservations should be swept"
+    print("✓ TokenBucket local_batch test passed\n")
+
+
+def fake_redis_storage():
+    """RedisStorage поверх fakeredis (с Lua) - None, если его нет"""
+    try:
+        import fakeredis
+    except ImportError:
+        return None
+    storage = RedisStorage()
+    storage._redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    return storage
+
+
+async def test_redis_storage_roundtrip():
+    print("Testing RedisStorage value round-trip...")
+    storage = fake_redis_storage()
+    if storage is None:
+        print("fakeredis[lua] is not installed - skipped\n")
+        return
+
+    # обычная запись числа - float, все остальное, что понял бы float(), - строка
+    for val in ("nan", "inf", "-inf", "Infinity", "1_000", " 5 ", "5\n", "1e999", "١٢", "1:2"):
+        await storage.set("test_roundtrip", val)
+        assert await storage.get("test_roundtrip") == val, f"{val!r} should stay a string"
+    for val in (42, -3, 0.5, 1e-05, 1e16, "7", ".5"):
+        await storage.set("test_roundtrip", val)
+        assert await storage.get("test_roundtrip") == float(val), f"{val!r} should read back as a number"
+    print("✓ RedisStorage round-trip test passed\n")
+
+
+async def test_acquire_all_redis():
+    print("Testing TokenBucketLimiter.acquire_all on Redis...")
+    storage = fake_redis_storage()
+    if storage is None:
+        print("fakeredis[lua] is not installed - skipped\n")
+        return
+
+    loose = TokenBucketLimiter(rate=5, per=60, storage=storage, scope="test_all_loose")
+    tight = TokenBucketLimiter(rate=1, per=60, storage=storage, scope="test_all_tight")
+    checks = [(loose, "k"), (tight, "k")]
+
+    assert await TokenBucketLimiter.acquire_all(checks) is None
+    # tight пуст - отказ с его индексом, а loose не тронут (все или ничего)
+    assert await TokenBucketLimiter.acquire_all(checks) == 1, "Should report the rejecting bucket"
+    available = (await loose.get_stats("k"))["available_tokens"]
+    assert 3.9 < available < 4.1, "Rejected acquire_all should not spend other buckets"
+    print("✓ acquire_all Redis test passed\n")
+
+
+async def test_leaky_bucket_redis():
+    print("Testing LeakyBucketLimiter Lua script on Redis...")
+    storage = fake_redis_storage()
+    if storage is None:
+        print("fakeredis[lua] is not installed - skipped\n")
+        return
+
+    # Lua и MemoryStorage должны вести ведро одинаково
+    for limiter in (
+        LeakyBucketLimiter(rate=1, capacity=3, storage=storage, scope="test_leaky"),
+        LeakyBucketLimiter(rate=1, capacity=3, scope="test_leaky"),
+    ):
+        results = [await limiter.acquire("k") for _ in range(4)]
+        assert results == [True, True, True, False], f"Capacity not applied: {results}"
+        acquired, retry_after = await limiter.acquire_wait("k")
+        assert not acquired and 0.9 < retry_after <= 1.0, "Wrong retry_after"
+        stats = await limiter.get_stats("k")
+        assert 2.9 < stats["current_level"] <= 3, "Level should be read back as 'level:time'"
+
+        await limiter.release("k", 2)
+        assert await limiter.acquire("k"), "Released space should be reusable"
+        assert await limiter.acquire("other"), "Keys should not share a bucket"
+
+    # ключ живет, пока ведро не вытечет (level / rate), плюс запас в секунду
+    ttl = await storage._redis.pttl("test_leaky:k")
+    assert 0 < ttl <= 3000, f"Wrong key TTL: {ttl}"
+    print("✓ LeakyBucket Redis test passed\n")
+
+
+async def test_composite_limiter():
+    print("Testing CompositeLimiter rollback and reorder...")
+    loose = LimiterFactory.gcra(rate=1000, per=60, scope="test_composite_loose")
+    tight = LimiterFactory.gcra(rate=1, per=60)
+    limiter = LimiterFactory.composite([loose, tight])
+
+    assert await limiter.acquire("k")
+    assert not await limiter.acquire("k")
+    # tight отказал - токен, который успел взять loose, вернулся
+    available = (await loose.get_stats("k"))["available_tokens"]
+    assert 998.9 < available < 999.1, "Granted token not released"
+
+    try:
+        LimiterFactory.composite([loose], tight)
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("parallel should be keyword-only")
+
+    # пересортировка: tight отказывает всегда и после нее проверяется первым,
+    # так что loose на отказах больше не дергается
+    limiter._REORDER_EVERY = 8
+    for _ in range(8):
+        await limiter.acquire("k")
+    name = "limiter.test_composite_loose.accepted"
+    before = (await get_stats())["counters"][name]
+    for _ in range(5):
+        assert not await limiter.acquire("k")
+    assert (await get_stats())["counters"][name] == before, \
+        "Most rejecting limiter should be checked first"
+
+    # скользящие окна тоже откатывают слот, если отказал сосед
+    windows = [
+        SlidingWindowLimiter(rate=2, per=60),
+        SlidingWindowLimiter(rate=2, per=60, approximate=True),
+    ]
+    storage = fake_redis_storage()
+    if storage is not None:
+        windows.append(RedisSlidingWindow(rate=2, per=60, storage=storage, scope="test_composite_window"))
+    for window in windows:
+        limiter = LimiterFactory.composite([window, LimiterFactory.gcra(rate=1, per=60)])
+        assert await limiter.acquire("k")
+        for _ in range(3):
+            assert not await limiter.acquire("k")
+        # в окне одно событие от принятого запроса, отказы его не заняли
+        assert await window.acquire("k"), f"{type(window).__name__} slot not released"
+        assert not await window.acquire("k")
+    print("✓ CompositeLimiter test passed\n")
+
+
+async def test_gcra_multi():
+    print("Testing GCRA with two limits...")
+    limiter = LimiterFactory.gcra_multi([(5, 1.0, None), (3, 60, None)])
+    
+    results = [await limiter.acquire("test") for _ in range(5)]
+    
+    print(f"Results: {results}")
+    assert results == [True, True, True, False, False], "Tighter limit not applied"
+    acquired, retry_after = await limiter.acquire_wait("test")
+    assert not acquired and retry_after > 1.0, "Wrong retry_after"
+    print("✓ GCRA test passed\n")
+
+
+async def test_gcra_keys_and_boundary():
+    print("Testing GCRA retry_after, keys and limit boundary...")
+    # 2 запроса на 0.2с (интервал 0.1с) и 3 в минуту (интервал 20с)
+    limiter = GCRALimiter([(2, 0.2, None), (3, 60, None)])
+
+    assert await limiter.acquire("a") and await limiter.acquire("a")
+    acquired, retry_after = await limiter.acquire_wait("a")
+    assert not acquired and 0 < retry_after <= 0.1, "Short limit should ask for one interval"
+    # отказ состояние не трогает, другой ключ живет своими бакетами
+    assert await limiter.acquire("b"), "Keys should not share state"
+
+    await asyncio.sleep(retry_after + 0.01)
+    assert await limiter.acquire("a"), "Request should pass after retry_after"
+    # короткий лимит уже пропустил бы, но минутный исчерпан (3 из 3)
+    await asyncio.sleep(0.15)
+    acquired, retry_after = await limiter.acquire_wait("a")
+    assert not acquired and retry_after > 10, "Long limit should reject at its boundary"
+
+    try:
+        GCRALimiter([])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Empty limits should be rejected")
+
+    # ключ с TAT в прошлом - то же, что новый: его выкидывает чистка
+    short = GCRALimiter([(10, 0.05, None)])
+    await short.acquire("idle")
+    await asyncio.sleep(0.15)
+    assert not short._tats, "Idle keys should be swept"
+    print("✓ GCRA keys test passed\n")
+
+
 async def test_priority_queue():
     print("Testing Priority Queue...")
     queue = QueueFactory.priority(workers=2)
@@ -33,9 +240,9 @@ async def test_priority_queue():
     async def task(name, priority):
         results.append(name)
     
-    await queue.put(lambda: task("low", 1), priority=1)
-    await queue.put(lambda: task("high", 10), priority=10)
-    await queue.put(lambda: task("medium", 5), priority=5)
+    await queue.put(partial(task, "low", 1), priority=1)
+    await queue.put(partial(task, "high", 10), priority=10)
+    await queue.put(partial(task, "medium", 5), priority=5)
     
     await asyncio.sleep(0.5)
     await queue.stop()
@@ -49,24 +256,80 @@ async def test_rate_limit_decorator():
     print("Testing @rate_limit decorator...")
     
     call_count = [0]
-    limiter = LimiterFactory.token_bucket(rate=3, per=1.0)
+    # 3 токена на 0.1с и свой scope - чтобы по счетчикам лимитера видеть
+    # именно этот тест, а не часы: 4-й и 5-й вызовы должны получить отказ
+    # и пройти после ожидания
+    limiter = LimiterFactory.token_bucket(rate=3, per=0.1, scope="test_rate_limit_decorator")
     
     @rate_limit(limiter=limiter)
     async def limited_func():
         call_count[0] += 1
         return "success"
     
-    start = asyncio.get_event_loop().time()
     for i in range(5):
         await limited_func()
-    elapsed = asyncio.get_event_loop().time() - start
     
-    print(f"Successful calls: {call_count[0]}, Time: {elapsed:.2f}s")
+    counters = (await get_stats())["counters"]
+    accepted = counters.get("limiter.test_rate_limit_decorator.accepted", 0)
+    rejected = counters.get("limiter.test_rate_limit_decorator.rejected", 0)
+    
+    print(f"Successful calls: {call_count[0]}, accepted: {accepted}, rejected: {rejected}")
     assert call_count[0] == 5, "All calls should succeed"
-    assert elapsed > 0.5, "Should have waited for rate limit"
+    assert accepted == 5, "Every call should pass the limiter exactly once"
+    assert rejected >= 2, "Should have waited for rate limit"
     print("✓ Rate limit decorator test passed\n")
 
 
+async def test_guarded():
+    print("Testing @guarded decorator...")
+
+    scope = "test_guarded"
+    limiter = LimiterFactory.token_bucket(rate=2, per=0.1, scope=scope)
+    queue = QueueFactory.fifo(workers=1)
+    await queue.start()
+    breaker = CircuitBreaker(failure_threshold=2, timeout=60)
+    calls = []
+
+    @guarded(limiter=limiter, queue=queue, breaker=breaker)
+    async def work(x):
+        calls.append(asyncio.current_task())
+        if x < 0:
+            raise ValueError(x)
+        return x * 2
+
+    # очередь: результат и ошибка приходят из воркера, а не из нашей таски
+    assert await work(1) == 2
+    assert calls[-1] is not asyncio.current_task(), "Call should run in a queue worker"
+    try:
+        await work(-1)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Error should come back through the queue")
+
+    # вторая ошибка размыкает цепь, дальше отказ сразу - без токена и очереди
+    try:
+        await work(-2)
+    except ValueError:
+        pass
+    counters = (await get_stats())["counters"]
+    # лимитер: 3-й вызов получил отказ и прошел после ожидания
+    assert counters.get(f"limiter.{scope}.rejected", 0) >= 1, "Limiter should have rejected"
+    accepted = counters[f"limiter.{scope}.accepted"]
+    try:
+        await work(3)
+    except CircuitBreakerOpen:
+        pass
+    else:
+        raise AssertionError("Open breaker should reject")
+    assert len(calls) == 3, "Rejected call should not run"
+    assert (await get_stats())["counters"][f"limiter.{scope}.accepted"] == accepted, \
+        "Rejected call should not take a token"
+
+    await queue.stop()
+    print("✓ guarded test passed\n")
+
+
 async def test_fifo_batching():
     print("Testing FIFO with batching...")
     
@@ -89,6 +352,96 @@ async def test_fifo_batching():
     print("✓ FIFO batching test passed\n")
 
 
+async def test_get_many():
+    print("Testing get_many on every queue type...")
+
+    fifo = QueueFactory.fifo()
+    dedupe = QueueFactory.dedupe()
+    priority = QueueFactory.priority()
+    for queue in (fifo, dedupe, priority):
+        await queue.put_many(["a", "b", "c"])
+        first = await queue.get_many(2)
+        rest = await queue.get_many(10)
+        assert len(first) == 2 and sorted(first + rest) == ["a", "b", "c"], "Wrong items"
+        assert await queue.get_many(10) == [], "Empty queue should not block"
+
+    # DelayQueue: отдаем только то, чье время пришло, и не ждем остальное
+    delay = QueueFactory.delay()
+    await delay.put("now")
+    await delay.put("later", delay=60)
+    async with _timeout(1):
+        assert await delay.get_many(10) == ["now"], "Not-yet-due items should stay"
+
+    # дефолт BaseQueue: пустая очередь с блокирующим get() не виснет
+    class Blocking(BaseQueue):
+        async def put(self, item, priority=0): pass
+        async def get(self): await asyncio.Event().wait()
+        async def size(self): return 1
+        async def start(self): pass
+        async def stop(self): pass
+
+    async with _timeout(1):
+        assert await Blocking().get_many(10) == []
+    print("✓ get_many test passed\n")
+
+
+async def test_dedupe_expiry():
+    print("Testing DedupeQueue key expiry ring...")
+    queue = QueueFactory.dedupe(workers=0, ttl=0.3)
+
+    await queue.put("a")
+    await queue.put_many(["a", "b", "b"])
+    assert await queue.size() == 2, "Duplicates should be dropped"
+
+    # ключ живет не меньше ttl
+    await asyncio.sleep(0.2)
+    await queue.put("a")
+    assert await queue.size() == 2, "Key expired before ttl"
+
+    # через ttl (+1 корзина) ключ ушел из кольца, а таймер уснул - помнить нечего
+    await asyncio.sleep(0.25)
+    assert not queue._seen and queue._timer is None, "Ring should be empty and idle"
+    await queue.put("a")
+    assert await queue.size() == 3, "Expired key should be accepted again"
+    print("✓ DedupeQueue expiry test passed\n")
+
+
+async def test_batch_flux():
+    print("Testing BatchFlux drainer and consumers...")
+
+    seen = []
+    sizes = []
+
+    async def handler(items):
+        sizes.append(len(items))
+        await asyncio.sleep(0.01)
+        seen.extend(items)
+        return items
+
+    # workers=0 у очереди - иначе ее собственные воркеры растащат элементы мимо flux
+    flux = BatchFlux(
+        QueueFactory.fifo(workers=0), handler,
+        config=FluxConfig(workers=3), name="test_batch_flux",
+        batch_size=10, batch_timeout=0.05
+    )
+    await flux.start()
+    await flux.submit_many(range(100))
+    assert await flux.wait_complete(timeout=5), "BatchFlux did not finish"
+    assert sorted(seen) == list(range(100)), "Every item should be processed exactly once"
+    assert max(sizes) <= 10, f"Batch larger than batch_size: {sizes}"
+    assert flux.stats()["processed"] == 100
+
+    # stop() дорабатывает уже собранное и не оставляет живых задач
+    await flux.submit_many(range(100, 125))
+    await flux.stop()
+    assert all(task.done() for task in flux._tasks), "stop() left tasks running"
+    assert len(seen) == len(set(seen)), "Items processed twice"
+    left = await flux.queue.size()
+    assert len(seen) + left == 125, "Items lost on stop()"
+    assert not flux._collector.pending, "Collector not flushed on stop()"
+    print("✓ BatchFlux test passed\n")
+
+
 async def test_adaptive_limiter():
     print("Testing Adaptive Limiter...")
     
@@ -108,6 +461,192 @@ async def test_adaptive_limiter():
     print("Adaptive limiter test passed\n")
 
 
+async def test_memory_storage_expiry():
+    print("Testing MemoryStorage expiry...")
+
+    storage = MemoryStorage()
+    await storage.set("short", 1, ttl=0.05)
+    await storage.set("forever", 2)
+
+    assert await storage.get("short") == 1
+    await asyncio.sleep(0.1)
+
+    assert await storage.get("short") is None, "Expired key should not be returned"
+    assert not await storage.exists("short")
+    assert await storage.get("forever") == 2
+    print("✓ MemoryStorage expiry test passed\n")
+
+
+async def test_memory_storage_sweep():
+    print("Testing MemoryStorage sweep across event loops...")
+
+    storage = MemoryStorage()
+    storage.sweep_interval = 0.01
+
+    def run_in_fresh_loops():
+        # вне loop'а set_nowait не падает - чистку взведет первый вызов из loop'а
+        storage.set_nowait("sync", 1, ttl=0.01)
+
+        async def round_(i):
+            await storage.set(f"k{i}", i, ttl=0.01)
+            await asyncio.sleep(0.1)
+            return len(storage._entries)
+
+        # каждый asyncio.run - новый loop: таймер от закрытого не должен мешать
+        for i in range(2):
+            assert asyncio.run(round_(i)) == 0, "Expired keys should be swept"
+
+    await asyncio.get_running_loop().run_in_executor(None, run_in_fresh_loops)
+    print("✓ MemoryStorage sweep test passed\n")
+
+
+async def test_sliding_window_sweep():
+    print("Testing SlidingWindowLimiter sweep across event loops...")
+
+    limiter = SlidingWindowLimiter(rate=2, per=0.01)
+
+    def run_in_fresh_loops():
+        async def round_(key, wait):
+            assert await limiter.acquire(key)
+            await asyncio.sleep(wait)
+            return len(limiter._windows)
+
+        # первый loop закрывается раньше, чем сработала чистка -
+        # второй не должен упереться в его таймер
+        asyncio.run(round_("a", 0))
+        assert asyncio.run(round_("b", 0.2)) == 0, "Idle windows should be swept"
+
+    await asyncio.get_running_loop().run_in_executor(None, run_in_fresh_loops)
+    print("✓ SlidingWindowLimiter sweep test passed\n")
+
+
+async def test_sliding_window_approximate():
+    print("Testing SlidingWindowLimiter approximate mode...")
+    limiter = SlidingWindowLimiter(rate=4, per=60, approximate=True)
+    results = [await limiter.acquire("a") for _ in range(5)]
+    assert results == [True] * 4 + [False], "Approximate limit not applied"
+    assert await limiter.acquire("b"), "Keys should not share counters"
+    assert (await limiter.get_stats("a"))["available"] == 0
+
+    # вес прошлого окна - доля, которая еще попадает в скользящее
+    counter = _Counter(10)
+    counter.cur = 4
+    assert counter.estimate(10.5) == 4, "Current window counts in full"
+    assert counter.estimate(11.25) == 3, "Previous window should be weighted by overlap"
+    assert counter.estimate(11.75) == 1
+    counter.cur = 2
+    assert counter.estimate(13.5) == 0, "Counters older than the previous window expire"
+
+    # счетчики простаивающих ключей выкидывает та же чистка, что и окна
+    limiter = SlidingWindowLimiter(rate=4, per=0.01, approximate=True)
+    assert await limiter.acquire("a")
+    await asyncio.sleep(0.2)
+    assert not limiter._counters, "Idle counters should be swept"
+    print("✓ SlidingWindowLimiter approximate test passed\n")
+
+
+async def test_worker_pool_sync_tasks():
+    print("Testing WorkerPool sync tasks...")
+
+    # по умолчанию синхронная функция работает в потоке loop'а,
+    # с sync_in_executor=True - в executor'е
+    for in_executor in (False, True):
+        pool = WorkerPool(min_workers=1, sync_in_executor=in_executor)
+        await pool.start()
+        ident = await pool.submit(threading.get_ident)
+        await pool.stop()
+        assert (ident != threading.get_ident()) == in_executor, "Wrong thread for sync task"
+    print("✓ WorkerPool sync tasks test passed\n")
+
+
+async def test_scheduler():
+    print("Testing Scheduler heap, wake-up and catch-up...")
+    scheduler = Scheduler()
+    runs = []
+
+    @scheduler.every(seconds=60, name="slow")
+    def slow():
+        runs.append("slow")
+
+    @scheduler.every(seconds=0.1, name="fast")
+    def fast():
+        runs.append("fast")
+
+    # перерегистрация под тем же именем: старая запись в куче не должна сработать
+    @scheduler.every(seconds=0.1, name="fast")
+    def fast_v2():
+        runs.append("fast_v2")
+
+    await scheduler.start()
+    await asyncio.sleep(0.25)
+    assert runs and set(runs) == {"fast_v2"}, f"Wrong jobs ran: {runs}"
+
+    # джоб, добавленный после старта, будит цикл, спящий до "slow" (60с)
+    @scheduler.every(seconds=0.1, name="late")
+    def late():
+        runs.append("late")
+
+    await asyncio.sleep(0.15)
+    assert "late" in runs, "New job should wake the scheduler"
+
+    # залипший loop: пропущенные запуски не гоняются подряд, сетка от плановых отметок
+    job = scheduler._jobs["fast"]
+    planned = job.next_run
+    runs.clear()
+    time.sleep(0.35)
+    await asyncio.sleep(0.02)
+    await scheduler.stop()
+    assert runs.count("fast_v2") == 1, f"Missed runs should be skipped: {runs}"
+    assert job.next_run > monotonic(), "next_run should move past the stall"
+    steps = (job.next_run - planned) / 0.1
+    assert abs(steps - round(steps)) < 1e-6, "next_run should stay on the planned grid"
+    print("✓ Scheduler test passed\n")
+
+
+async def test_queued_sync():
+    print("Testing queued_sync from a running loop...")
+
+    @queued_sync(workers=2)
+    def double(x):
+        return x * 2
+
+    # раньше тут падало с "This event loop is already running"
+    assert double(21) == 42
+
+    # своя незапущенная очередь - queued_sync запускает ее в фоновом loop сам
+    own = QueueFactory.fifo(workers=1)
+
+    @queued_sync(queue=own)
+    def triple(x):
+        return x * 3
+
+    assert triple(3) == 9
+
+    # очередь, запущенная в нашем loop, фоновым loop не обслуживается - отказ сразу
+    foreign = QueueFactory.fifo(workers=1)
+    await foreign.start()
+    try:
+        queued_sync(queue=foreign)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Started foreign queue should be rejected")
+    await foreign.stop()
+
+    # вызов из фонового loop - ошибка вместо дедлока
+    async def call_from_background():
+        return double(1)
+
+    background = asyncio.run_coroutine_threadsafe(call_from_background(), _background_loop())
+    try:
+        await asyncio.wrap_future(background)
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("Call from the background loop should fail fast")
+    print("✓ queued_sync test passed\n")
+
+
 async def main():
     print("="*60)
     print("Running AioFlux Tests")
@@ -115,10 +654,28 @@ async def main():
     
     tests = [
         test_token_bucket,
+        test_token_bucket_local_batch,
+        test_redis_storage_roundtrip,
+        test_acquire_all_redis,
+        test_leaky_bucket_redis,
+        test_composite_limiter,
+        test_gcra_multi,
+        test_gcra_keys_and_boundary,
         test_priority_queue,
         test_rate_limit_decorator,
+        test_guarded,
         test_fifo_batching,
+        test_get_many,
+        test_batch_flux,
+        test_dedupe_expiry,
         test_adaptive_limiter,
+        test_memory_storage_expiry,
+        test_memory_storage_sweep,
+        test_sliding_window_sweep,
+        test_sliding_window_approximate,
+        test_worker_pool_sync_tasks,
+        test_scheduler,
+        test_queued_sync,
     ]
     
     passed = 0